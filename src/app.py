@@ -10,6 +10,7 @@
 # Архитектура:
 # - GET / возвращает форму для ввода текста
 # - POST / обрабатывает перевод и оценку текста
+# - POST /translate/stream отдает перевод потоком (server-sent events)
 #
 # Начинающим QA-специалистам: это главный файл приложения, который
 # обрабатывает все HTTP запросы от браузера пользователя
@@ -17,9 +18,16 @@
 
 
 
-from flask import Flask, render_template, request, jsonify
+import atexit
+import logging
+import logging.handlers
+import queue
+import re
+from typing import Iterator, Optional, Tuple
+import orjson
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context
 from src.config import Config
-from src.services.llm_client import call_llm
+from src.services.llm_client import LLMStreamError, call_llm, call_llm_stream
 
 
 
@@ -41,6 +49,24 @@ app.config.from_object(Config)
 
 
 
+# Настраиваем логирование через очередь: обработчик запроса только кладет
+# запись в queue.Queue, а вывод в консоль выполняет отдельный поток
+# QueueListener. Так HTTP воркер никогда не ждет блокировку sys.stderr.
+_log_queue = queue.Queue(-1)
+_log_listener = logging.handlers.QueueListener(
+    _log_queue,
+    logging.StreamHandler(),
+    respect_handler_level=True
+)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+_app_logger = logging.getLogger("src")
+_app_logger.setLevel(Config.LOG_LEVEL)
+_app_logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+
+
+
 # Логируем запуск приложения
 print("=" * 70)
 print("🚀 Flask приложение 'AI Translator & Critic' запускается...")
@@ -184,12 +210,142 @@ Reasoning: [your explanation]"""
 
 
 
+# Регулярные выражения для разбора ответа в объединенном режиме
+# (компилируются один раз при импорте модуля)
+_TRANSLATION_BLOCK = re.compile(r"<TRANSLATION>\s*(.*?)\s*</TRANSLATION>", re.DOTALL)
+_EVALUATION_BLOCK = re.compile(r"<EVALUATION>\s*(.*?)\s*</EVALUATION>", re.DOTALL)
+
+
+
+
+def build_combined_prompt(text: str, language: str) -> str:
+    """
+    Строит промпт, который просит модель СРАЗУ перевести текст и оценить перевод.
+    
+    Аргументы:
+        text (str): Исходный текст для перевода
+        language (str): Целевой язык
+    
+    Возвращает:
+        str: Промпт для одного запроса вместо двух (перевод + оценка)
+    
+    Модель должна вернуть ответ в виде двух блоков:
+        <TRANSLATION>...</TRANSLATION>
+        <EVALUATION>Rating: ...  Reasoning: ...</EVALUATION>
+    
+    Начинающим QA-специалистам: используется только при FUSE_LLM_CALLS=1.
+    """
+    
+    language_name = Config.SUPPORTED_LANGUAGES.get(language, language)
+    
+    prompt = f"""Translate the following text to {language_name}, then evaluate the quality
+of your translation from 1 to 10 considering accuracy, fluency, and completeness.
+
+
+
+Text to translate:
+{text}
+
+
+
+Respond strictly in the following format:
+<TRANSLATION>
+[only the translated text]
+</TRANSLATION>
+<EVALUATION>
+Rating: [1-10]
+Reasoning: [your explanation]
+</EVALUATION>"""
+    
+    return prompt
+
+
+
+
+def parse_combined_response(response: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Разбирает ответ модели в объединенном режиме на перевод и оценку.
+    
+    Аргументы:
+        response (str | None): Сырой ответ LLM
+    
+    Возвращает:
+        tuple: (перевод, оценка). Любой из элементов может быть None.
+    
+    Если модель не соблюла формат и блока <TRANSLATION> нет, переводом
+    считается весь ответ без блока <EVALUATION> (если он есть).
+    """
+    
+    if not response:
+        return None, None
+    
+    translation_match = _TRANSLATION_BLOCK.search(response)
+    evaluation_match = _EVALUATION_BLOCK.search(response)
+    
+    if translation_match:
+        translated_text = translation_match.group(1)
+    else:
+        translated_text = _EVALUATION_BLOCK.sub("", response).strip()
+    evaluation_result = evaluation_match.group(1) if evaluation_match else None
+    
+    return translated_text or None, evaluation_result or None
+
+
+
+
+
+def translate_and_rate(text: str, language: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Переводит текст и оценивает перевод ОДНИМ запросом к LLM.
+    
+    Аргументы:
+        text (str): Исходный текст для перевода
+        language (str): Целевой язык
+    
+    Возвращает:
+        tuple: (перевод, оценка), как parse_combined_response
+    
+    Вместо двух последовательных запросов (перевод, затем оценка) модель
+    перевода получает объединенный промпт - это один сетевой запрос
+    вместо двух. Используется маршрутом POST / при FUSE_LLM_CALLS=1.
+    """
+    
+    combined_prompt = build_combined_prompt(text, language)
+    return parse_combined_response(
+        call_llm(
+            model_name=Config.TRANSLATION_MODEL,
+            prompt=combined_prompt
+        )
+    )
+
+
+
+
 # ============================================================================
 # МАРШРУТЫ (ENDPOINTS)
 # ============================================================================
 
 
 
+@app.context_processor
+def inject_stream_settings() -> dict:
+    """
+    Передает во все шаблоны, подключать ли на странице потоковый перевод.
+    
+    Страница показывает перевод из POST /translate/stream по мере генерации,
+    а затем отправляет форму на POST / за оценкой. Повторный перевод при
+    этом берется из кэша ответов, поэтому поток включается только при
+    включенном кэше и без FUSE_LLM_CALLS (там перевод и оценка приходят
+    одним запросом с другим промптом, и кэш не совпал бы).
+    """
+    
+    return {
+        "stream_translation_enabled": Config.LLM_CACHE_ENABLED and not Config.FUSE_LLM_CALLS
+    }
+
+
+
+
 @app.route("/", methods=["GET"])
 def index():
     """
@@ -238,6 +394,7 @@ def process_translation():
     Процесс (из требований):
     - Шаг 1: call_llm с моделью Qwen для перевода
     - Шаг 2: call_llm с моделью Claude для оценки
+    При FUSE_LLM_CALLS=1 оба шага выполняются одним запросом к Qwen.
     
     Возвращает:
         HTML страница с оригиналом, переводом и оценкой качества
@@ -292,11 +449,17 @@ def process_translation():
     print(f"\n🔄 Начинаем перевод текста...")
     print(f"   Используем модель: {Config.TRANSLATION_MODEL}")
     
-    translation_prompt = build_translation_prompt(original_text, target_language)
-    translated_text = call_llm(
-        model_name=Config.TRANSLATION_MODEL,
-        prompt=translation_prompt
-    )
+    if Config.FUSE_LLM_CALLS:
+        # Объединенный режим: один запрос возвращает и перевод, и оценку
+        print(f"   Объединенный режим: перевод и оценка одним запросом")
+        
+        translated_text, evaluation_result = translate_and_rate(original_text, target_language)
+    else:
+        translation_prompt = build_translation_prompt(original_text, target_language)
+        translated_text = call_llm(
+            model_name=Config.TRANSLATION_MODEL,
+            prompt=translation_prompt
+        )
     
     # Проверяем, успешно ли выполнен перевод
     if not translated_text:
@@ -320,15 +483,19 @@ def process_translation():
     # ====================================================================
     # Используем модель Claude для оценки перевода
     # Эта модель - "судья", которая оценит качество перевода от 1 до 10
+    # В объединенном режиме оценка уже получена на шаге 3
+    # Шаги 3 и 4 нельзя выполнить параллельно: промпт оценки содержит
+    # готовый перевод. Сократить число запросов можно через FUSE_LLM_CALLS.
     
-    print(f"\n⭐ Оцениваем качество перевода...")
-    print(f"   Используем модель: {Config.EVALUATION_MODEL}")
-    
-    evaluation_prompt = build_evaluation_prompt(original_text, translated_text)
-    evaluation_result = call_llm(
-        model_name=Config.EVALUATION_MODEL,
-        prompt=evaluation_prompt
-    )
+    if not Config.FUSE_LLM_CALLS:
+        print(f"\n⭐ Оцениваем качество перевода...")
+        print(f"   Используем модель: {Config.EVALUATION_MODEL}")
+        
+        evaluation_prompt = build_evaluation_prompt(original_text, translated_text)
+        evaluation_result = call_llm(
+            model_name=Config.EVALUATION_MODEL,
+            prompt=evaluation_prompt
+        )
     
     # Проверяем, успешна ли оценка
     if not evaluation_result:
@@ -361,6 +528,60 @@ def process_translation():
 
 
 
+@app.route("/translate/stream", methods=["POST"])
+def stream_translation():
+    """
+    Маршрут POST /translate/stream - потоковый перевод текста.
+    
+    Принимает те же поля формы, что и POST /, но вместо HTML страницы
+    возвращает поток server-sent events: каждое событие "data: {...}"
+    содержит очередной фрагмент перевода в поле "delta", последнее
+    событие - {"done": true}. Если перевод не удался (ошибка API, таймаут,
+    выключатель разомкнут), последним событием будет {"error": "..."}.
+    
+    EventSource поддерживает только GET, поэтому клиент читает поток через
+    fetch() и response.body (ReadableStream) и может показывать перевод
+    по мере генерации, не дожидаясь полного ответа LLM. Так делает
+    index.html (см. inject_stream_settings).
+    
+    Оценка качества здесь не выполняется: ей нужен полный перевод,
+    поэтому для нее остается синхронный маршрут POST /.
+    
+    Возвращает:
+        text/event-stream с фрагментами перевода, либо JSON с ошибкой
+        валидации и кодом 400
+    """
+    
+    print(f"📨 POST запрос на {request.path}")
+    
+    original_text = request.form.get("text", "").strip()
+    target_language = request.form.get("language", "")
+    
+    validation_result = validate_translation_input(original_text, target_language)
+    
+    if not validation_result["is_valid"]:
+        print(f"⚠️  {validation_result['error_message']}")
+        return jsonify({"error": validation_result["error_message"]}), 400
+    
+    translation_prompt = build_translation_prompt(original_text, target_language)
+    
+    def generate() -> Iterator[bytes]:
+        try:
+            for delta in call_llm_stream(Config.TRANSLATION_MODEL, translation_prompt):
+                yield b"data: " + orjson.dumps({"delta": delta}) + b"\n\n"
+        except LLMStreamError:
+            # Подробности ошибки уже записаны в лог клиентом LLM
+            print(f"❌ Ошибка при потоковом переводе текста")
+            error_msg = "❌ Ошибка: Не удалось перевести текст. Пожалуйста, попробуйте позже."
+            yield b"data: " + orjson.dumps({"error": error_msg}) + b"\n\n"
+            return
+        yield b'data: {"done":true}\n\n'
+    
+    return Response(stream_with_context(generate()), mimetype="text/event-stream")
+
+
+
+
 # ============================================================================
 # ЗАПУСК ПРИЛОЖЕНИЯ
 # ============================================================================
@@ -9,6 +9,19 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+_LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+
+
+def _env_log_level() -> str:
+    """
+    Читает LOG_LEVEL из окружения. Неизвестное значение (например,
+    LOG_LEVEL=verbose) заменяется на WARNING, иначе logging.setLevel
+    выбросил бы ValueError и приложение не запустилось бы.
+    """
+    level = os.getenv("LOG_LEVEL", "WARNING").strip().upper()
+    return level if level in _LOG_LEVELS else "WARNING"
+
+
 class Config:
     """
     Класс конфигурации приложения.
@@ -24,6 +37,24 @@ class Config:
     API_ENDPOINT = "https://api.mentorpiece.org/v1/process-ai-request"
     API_AUTH_HEADER = f"Bearer {API_KEY}" if API_KEY else None
 
+    # Таймауты запроса к API (секунды): подключение и ожидание ответа.
+    # Недоступный сервер обнаруживается за CONNECT_TIMEOUT, а модель
+    # по-прежнему может генерировать ответ до READ_TIMEOUT
+    CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "3"))
+    READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", "30"))
+
+    # Circuit breaker: после BREAKER_FAILURE_THRESHOLD ошибок подключения
+    # за BREAKER_WINDOW секунд запросы к API не отправляются
+    # BREAKER_COOLDOWN секунд (сразу возвращается ошибка)
+    BREAKER_FAILURE_THRESHOLD = int(os.getenv("LLM_BREAKER_FAILURE_THRESHOLD", "5"))
+    BREAKER_WINDOW = float(os.getenv("LLM_BREAKER_WINDOW", "30"))
+    BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", "30"))
+
+    # Пул HTTP соединений к API: сколько хостов держать в пуле и сколько
+    # keep-alive соединений к одному хосту (≈ число параллельных запросов)
+    POOL_CONNECTIONS = int(os.getenv("LLM_POOL_CONNECTIONS", "16"))
+    POOL_MAXSIZE = int(os.getenv("LLM_POOL_MAXSIZE", "32"))
+
     # ========================================================================
     # МОДЕЛИ LLM (указываем какие модели будем использовать)
     # ========================================================================
@@ -31,6 +62,12 @@ class Config:
     TRANSLATION_MODEL = "Qwen/Qwen3-VL-30B-A3B-Instruct"
     EVALUATION_MODEL = "claude-sonnet-4-5-20250929"
 
+    # Объединенный режим: перевод и оценка выполняются ОДНИМ запросом к
+    # TRANSLATION_MODEL вместо двух последовательных. Вдвое меньше сетевых
+    # round-trip, но оценку дает та же модель, что и переводит.
+    # Включить: FUSE_LLM_CALLS=1
+    FUSE_LLM_CALLS = os.getenv("FUSE_LLM_CALLS", "0").lower() in ("1", "true", "yes")
+
     # ========================================================================
     # НАСТРОЙКИ FLASK
     # ========================================================================
@@ -38,6 +75,11 @@ class Config:
     DEBUG = True
     SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-key-change-in-production")
 
+    # Уровень логирования модулей приложения (DEBUG, INFO, WARNING, ERROR).
+    # По умолчанию WARNING: в логах только ошибки, без подробностей запросов.
+    # Для отладки запросов к API: LOG_LEVEL=DEBUG
+    LOG_LEVEL = _env_log_level()
+
     # ========================================================================
     # РЕЖИМ ТЕСТИРОВАНИЯ / МОКИ ДЛЯ LLM
     # ========================================================================
@@ -51,16 +93,43 @@ class Config:
     #
     # Почему нужен для Cypress:
     # cy.intercept() перехватывает запросы из БРАУЗЕРА, но Flask делает
-    # запросы на СЕРВЕРЕ через Python requests.post(). cy.intercept() их не видит!
+    # запросы на СЕРВЕРЕ через Python requests (session.post()). cy.intercept() их не видит!
     # Поэтому для Cypress мы используем встроенные моки через этот флаг.
     ENABLE_MOCKS = os.getenv("ENABLE_LLM_MOCKS", "0").lower() in ("1", "true", "yes")
 
+    # ========================================================================
+    # КЭШ ОТВЕТОВ LLM
+    # ========================================================================
+
+    # Повторный запрос с тем же (model_name, prompt) берется из SQLite кэша
+    # вместо обращения к API. Отключить: LLM_CACHE_ENABLED=0
+    LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1").lower() in ("1", "true", "yes")
+    LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite3")
+    LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 60 * 60)))  # 7 дней
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+
+    # Перед SQLite стоит небольшой кэш в памяти процесса: горячие ответы
+    # отдаются без обращения к файлу. Записи живут LLM_MEMORY_CACHE_TTL секунд.
+    LLM_MEMORY_CACHE_TTL = int(os.getenv("LLM_MEMORY_CACHE_TTL", "300"))
+    LLM_MEMORY_CACHE_MAX_ENTRIES = int(os.getenv("LLM_MEMORY_CACHE_MAX_ENTRIES", "1024"))
+
+    # Семантический кэш: ответ для ПОХОЖЕГО промпта ("Hello world" и
+    # "hello world!"), если косинусное сходство >= порога.
+    # Выключен по умолчанию. Включить: SEMANTIC_CACHE_ENABLED=1
+    SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "0").lower() in ("1", "true", "yes")
+    SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+    SEMANTIC_CACHE_MAX_SIZE = int(os.getenv("SEMANTIC_CACHE_MAX_SIZE", "5000"))
+
     # ========================================================================
     # ПАРАМЕТРЫ ПРИЛОЖЕНИЯ
     # ========================================================================
 
     MAX_TEXT_LENGTH = 5000
 
+    # Жесткий лимит размера промпта (в байтах UTF-8) на уровне LLM клиента.
+    # Промпт больше лимита отклоняется без сетевого запроса.
+    MAX_PROMPT_BYTES = int(os.getenv("MAX_PROMPT_BYTES", "200000"))
+
     SUPPORTED_LANGUAGES = {
         "english": "English",
         "french": "French",
@@ -0,0 +1,112 @@
+# ============================================================================
+# circuit_breaker.py - Автоматический выключатель для запросов к LLM API
+# ============================================================================
+# Если API недоступен (не удается установить соединение), каждый запрос
+# пользователя все равно ждал бы таймаут подключения. Выключатель считает
+# такие ошибки и после failure_threshold ошибок за window секунд
+# "размыкается": следующие cooldown секунд запросы сразу отклоняются, не
+# занимая воркер Flask.
+#
+# Состояния:
+# - ЗАМКНУТ (closed): запросы проходят, ошибки подключения считаются
+# - РАЗОМКНУТ (open): запросы отклоняются до конца cooldown
+# - ПОЛУОТКРЫТ (half-open): после cooldown пропускается ОДИН пробный
+#   запрос, остальные отклоняются до его результата; успех замыкает
+#   выключатель, ошибка снова размыкает его. Если результат пробного
+#   запроса так и не пришел за cooldown, пропускается новый пробный запрос.
+#
+# Начинающим QA-специалистам: это стандартный паттерн "Circuit Breaker" -
+# он защищает приложение, пока внешний сервис лежит.
+# ============================================================================
+
+
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+
+class CircuitBreaker:
+    """
+    Потокобезопасный выключатель по количеству ошибок подключения.
+    """
+
+    def __init__(self, failure_threshold: int = 5, window: float = 30.0, cooldown: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.window = window
+        self.cooldown = cooldown
+
+        self._failures: deque = deque()
+        self._opened_at: Optional[float] = None
+        self._half_open = False
+        self._trial_started_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """
+        Можно ли сейчас отправить запрос к API.
+        """
+        now = time.monotonic()
+
+        with self._lock:
+            if self._half_open:
+                # Пробный запрос уже выполняется - остальные ждут его результат
+                if now - self._trial_started_at >= self.cooldown:
+                    self._trial_started_at = now
+                    return True
+                return False
+
+            if self._opened_at is None:
+                return True
+
+            if now - self._opened_at >= self.cooldown:
+                # Cooldown прошел: пропускаем один пробный запрос
+                self._opened_at = None
+                self._half_open = True
+                self._trial_started_at = now
+                return True
+
+            return False
+
+    def record_failure(self) -> None:
+        """
+        Регистрирует ошибку подключения к API.
+        """
+        now = time.monotonic()
+
+        with self._lock:
+            if self._half_open:
+                self._open(now)
+                return
+
+            self._failures.append(now)
+            while self._failures and now - self._failures[0] > self.window:
+                self._failures.popleft()
+
+            if len(self._failures) >= self.failure_threshold:
+                self._open(now)
+
+    def record_success(self) -> None:
+        """
+        Регистрирует успешное подключение: счетчик ошибок сбрасывается.
+        """
+        with self._lock:
+            self._failures.clear()
+            self._half_open = False
+            self._trial_started_at = None
+
+    def reset(self) -> None:
+        """
+        Возвращает выключатель в исходное (замкнутое) состояние.
+        """
+        with self._lock:
+            self._failures.clear()
+            self._opened_at = None
+            self._half_open = False
+            self._trial_started_at = None
+
+    def _open(self, now: float) -> None:
+        self._opened_at = now
+        self._half_open = False
+        self._trial_started_at = None
+        self._failures.clear()
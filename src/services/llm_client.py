@@ -3,10 +3,135 @@
 # ============================================================================
 
 
+import asyncio
+import logging
+import threading
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
 import requests
-import json
-from typing import Optional
+import aiohttp
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
+import re
+from typing import Dict, Iterator, Optional
 from src.config import Config
+from src.services import response_cache
+from src.services.circuit_breaker import CircuitBreaker
+from src.services.semantic_cache import SemanticCache
+
+
+# Логгер модуля. Сообщения форматируются лениво (%-стиль): строки собираются
+# только если уровень логирования включен (Config.LOG_LEVEL)
+logger = logging.getLogger(__name__)
+
+
+class _TruncateArgsFilter(logging.Filter):
+    """
+    Обрезает длинные строковые аргументы сообщений (промпты, ответы API),
+    чтобы логи оставались читаемыми. Работает только для записей, которые
+    уже прошли проверку уровня, поэтому не стоит ничего при выключенном DEBUG.
+    """
+
+    MAX_ARG_LENGTH = 100
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if isinstance(record.args, tuple):
+            record.args = tuple(
+                arg[:self.MAX_ARG_LENGTH] + "..."
+                if isinstance(arg, str) and len(arg) > self.MAX_ARG_LENGTH
+                else arg
+                for arg in record.args
+            )
+        return True
+
+
+logger.addFilter(_TruncateArgsFilter())
+
+
+# Семейство модели для мокированных ответов (Cypress) определяется одним
+# поиском по заранее скомпилированному выражению
+_MOCK_MODEL_FAMILY = re.compile(r"(qwen|claude-sonnet)", re.IGNORECASE)
+
+
+# Тело запроса всегда имеет вид {"model_name": ..., "prompt": ...} с
+# фиксированным порядком ключей, поэтому JSON собирается из готовых
+# байтовых кусков - кодировать (экранировать) нужно только сами строки
+_BODY_PREFIX = b'{"model_name":"'
+_BODY_MIDDLE = b'","prompt":"'
+_BODY_SUFFIX = b'"}'
+
+
+def _json_escape(value: str) -> bytes:
+    """
+    Экранирует строку для JSON (без внешних кавычек).
+    """
+    return orjson.dumps(value)[1:-1]
+
+
+def _encode_request_body(model_name: str, prompt: str) -> bytes:
+    """
+    Собирает JSON тело запроса к API в виде bytes.
+    """
+    return (
+        _BODY_PREFIX + _json_escape(model_name)
+        + _BODY_MIDDLE + _json_escape(prompt)
+        + _BODY_SUFFIX
+    )
+
+
+def _prompt_too_large(prompt: str) -> bool:
+    """
+    Проверяет, превышает ли промпт Config.MAX_PROMPT_BYTES в UTF-8.
+    
+    Символ UTF-8 занимает от 1 до 4 байт, поэтому в обычном случае
+    ответ известен по длине строки, и кодировать промпт не нужно.
+    """
+    limit = Config.MAX_PROMPT_BYTES
+    
+    if len(prompt) * 4 <= limit:
+        return False
+    if len(prompt) > limit:
+        return True
+    
+    return len(prompt.encode("utf-8", errors="ignore")) > limit
+
+
+# Таймауты aiohttp: ServerTimeoutError - общий базовый класс таймаутов
+# подключения и чтения сокета. Начиная с aiohttp 3.10 таймаут чтения -
+# отдельный SocketTimeoutError; в более ранних версиях оба таймаута
+# неразличимы и считаются ошибкой подключения.
+_AIOHTTP_READ_TIMEOUT = getattr(aiohttp, "SocketTimeoutError", ())
+
+
+async def _close_on_loop_shutdown(session: aiohttp.ClientSession, sessions: weakref.WeakKeyDictionary):
+    """
+    Асинхронный генератор, который закрывает aiohttp-сессию при остановке
+    event loop.
+    
+    После первого шага генератор ждет на yield. asyncio.run (и
+    loop.shutdown_asyncgens) при завершении loop закрывает все незавершенные
+    асинхронные генераторы - блок finally выполняется в ТОМ ЖЕ loop, где
+    создана сессия, и корректно закрывает ее соединения. Запись о сессии
+    удаляется из sessions: сессия ссылается на свой loop, поэтому сама
+    WeakKeyDictionary эту запись не освободила бы.
+    """
+    try:
+        yield
+    finally:
+        sessions.pop(asyncio.get_running_loop(), None)
+        if not session.closed:
+            await session.close()
+
+
+class LLMStreamError(Exception):
+    """
+    Ошибка потокового вызова LLM (call_llm_stream).
+    
+    В отличие от call_llm, который возвращает None, генератор не может
+    вернуть признак ошибки, поэтому выбрасывает это исключение. Текст
+    исключения - короткое описание причины без деталей из ответа API.
+    """
 
 
 class LLMClient:
@@ -17,105 +142,695 @@ class LLMClient:
     def __init__(self):
         self.api_endpoint = Config.API_ENDPOINT
         self.api_key = Config.API_KEY
-        self.headers = {
+        # Таймаут (подключение, чтение): мертвый endpoint обнаруживается
+        # за несколько секунд, а не за все время ожидания ответа модели
+        self.timeout = (Config.CONNECT_TIMEOUT, Config.READ_TIMEOUT)
+        self._async_timeout = aiohttp.ClientTimeout(
+            sock_connect=Config.CONNECT_TIMEOUT,
+            sock_read=Config.READ_TIMEOUT,
+            total=Config.CONNECT_TIMEOUT + Config.READ_TIMEOUT + 2
+        )
+
+        # Выключатель: при недоступном API запросы сразу отклоняются
+        self._breaker = CircuitBreaker(
+            failure_threshold=Config.BREAKER_FAILURE_THRESHOLD,
+            window=Config.BREAKER_WINDOW,
+            cooldown=Config.BREAKER_COOLDOWN
+        )
+
+        # Заголовки собираются один раз и передаются обеим сессиям
+        # (requests и aiohttp) при создании, а не в каждом запросе
+        self._headers = {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {self.api_key}"
         }
-        self.timeout = 30
 
-    def call_llm(self, model_name: str, prompt: str) -> Optional[str]:
+        # Мокированные ответы по семейству модели (режим ENABLE_MOCKS)
+        self._mock_table = {
+            "qwen": "The sun is shining.",
+            "claude-sonnet": "Rating: 9/10. Fluent and accurate.",
+        }
+        self._mock_default = "Mocked Response: Default answer"
+
+        # Постоянная HTTP сессия: пул соединений (keep-alive) переиспользуется
+        # между вызовами, поэтому оценка после перевода не делает повторное
+        # TCP/TLS рукопожатие. Заголовки задаются один раз на уровне сессии.
+        # Повторы только для временных ошибок шлюза (502/503/504); POST здесь
+        # безопасно повторять - запросы к LLM не имеют побочных эффектов.
+        # Таймауты и ошибки подключения НЕ повторяются: иначе медленная
+        # модель стоила бы 3 x READ_TIMEOUT, а недоступный хост -
+        # 3 x CONNECT_TIMEOUT. read=False (а не 0): urllib3 пробрасывает
+        # исходный ReadTimeoutError, и requests выдает ReadTimeout; при
+        # исчерпанном read=0 он превратился бы в ConnectionError.
+        # Заголовок Retry-After игнорируется: urllib3 спал бы столько, сколько
+        # попросил сервер (без ограничения и вне READ_TIMEOUT), а так пауза
+        # между повторами - только backoff_factor.
+        retry = Retry(
+            total=2,
+            connect=0,
+            read=False,
+            other=0,
+            status=2,
+            backoff_factor=0.2,
+            status_forcelist=[502, 503, 504],
+            allowed_methods=frozenset({"POST"}),
+            respect_retry_after_header=False,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=Config.POOL_CONNECTIONS,
+            pool_maxsize=Config.POOL_MAXSIZE,
+            max_retries=retry
+        )
+
+        # Адаптер монтируется и на http:// - иначе запросы к локальному или
+        # внутреннему endpoint без TLS шли бы через адаптер по умолчанию
+        # (маленький пул и без повторов)
+        self._session = requests.Session()
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._session.headers.update(self._headers)
+
+        # Семантический кэш (похожие промпты) живет в памяти процесса
+        self._semantic_cache = SemanticCache(
+            threshold=Config.SEMANTIC_CACHE_THRESHOLD,
+            max_size=Config.SEMANTIC_CACHE_MAX_SIZE
+        )
+
+        # Асинхронные сессии aiohttp создаются лениво, по одной на event loop
+        # (см. _get_async_session): event loop -> (сессия, генератор закрытия)
+        self._async_sessions: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._async_sessions_lock = threading.Lock()
+
+        # Пул потоков для submit_llm создается при первом использовании
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+        # Запросы, которые выполняются прямо сейчас (single-flight):
+        # ключ запроса -> Future с будущим ответом
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        self._async_inflight: Dict[str, asyncio.Future] = {}
+
+        # call_llm = _call_mock или _call_real (см. reset_for_tests)
+        self.reset_for_tests()
+
+    @staticmethod
+    def _model_family(model_name: str) -> Optional[str]:
+        """
+        Возвращает семейство модели ("qwen", "claude-sonnet") или None.
+        """
+        match = _MOCK_MODEL_FAMILY.search(model_name)
+        return match.group(1).lower() if match else None
+
+    def _cache_lookup(self, model_name: str, prompt: str) -> tuple:
+        """
+        Ищет ответ в кэшах: сначала точный (SQLite), затем семантический.
+        
+        Возвращает:
+            tuple: (ключ точного кэша или None, найденный ответ или None)
+        """
+        cache_key = None
+        
+        if Config.LLM_CACHE_ENABLED:
+            cache_key = response_cache.make_key(model_name, prompt)
+            cached_response = response_cache.get(cache_key)
+            if cached_response is not None:
+                logger.debug("⚡ Ответ для модели %s взят из кэша", model_name)
+                return cache_key, cached_response
+        
+        if Config.SEMANTIC_CACHE_ENABLED:
+            similar_response = self._semantic_cache.get(model_name, prompt)
+            if similar_response is not None:
+                logger.debug("⚡ Ответ для модели %s взят из семантического кэша", model_name)
+                return cache_key, similar_response
+        
+        return cache_key, None
+
+    def _cache_store(self, cache_key: Optional[str], model_name: str, prompt: str, llm_response: str) -> None:
+        """
+        Сохраняет успешный ответ во включенные кэши.
+        """
+        if cache_key is not None:
+            response_cache.set(cache_key, llm_response, model_name)
+        
+        if Config.SEMANTIC_CACHE_ENABLED:
+            self._semantic_cache.add(model_name, prompt, llm_response)
+
+    def reset_for_tests(self) -> None:
         """
-        Главный метод для вызова LLM модели через API.
+        Выбирает реализацию call_llm по текущему значению Config.ENABLE_MOCKS.
+        
+        Вызывается в __init__: флаг читается один раз, и в call_llm нет
+        проверки режима на каждый вызов. Тесты, которые меняют
+        Config.ENABLE_MOCKS во время выполнения, должны вызвать этот метод
+        (или reset_client_for_tests() для общего клиента).
         
-        РЕЖИМЫ РАБОТЫ:
-        1. Обычный режим (ENABLE_MOCKS=False): реальные запросы к API
-        2. Тестовый режим Cypress (ENABLE_MOCKS=True): мокированные ответы
+        РЕЖИМЫ РАБОТЫ call_llm:
+        1. Обычный режим (ENABLE_MOCKS=False): _call_real, реальные запросы к API
+        2. Тестовый режим Cypress (ENABLE_MOCKS=True): _call_mock, мокированные ответы
         3. Pytest тесты: используют @mock.patch, не зависят от ENABLE_MOCKS
         """
+        self._mocks_enabled = Config.ENABLE_MOCKS
+        self.call_llm = self._call_mock if self._mocks_enabled else self._call_real
+
+    def _call_mock(self, model_name: str, prompt: str) -> Optional[str]:
+        """
+        Мокированный ответ для Cypress UI-тестов (ENABLE_MOCKS=True).
+        API не вызывается, ответ выбирается по семейству модели.
+        """
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("🔧 MOCK MODE (Cypress): мокированный ответ для модели %s", model_name)
+        
+        return self._mock_table.get(self._model_family(model_name), self._mock_default)
+
+    def _call_real(self, model_name: str, prompt: str) -> Optional[str]:
+        """
+        Главный метод для вызова LLM модели через API
+        (доступен как call_llm, когда ENABLE_MOCKS=False).
+        """
         
         # ====================================================================
-        # РЕЖИМ ТЕСТИРОВАНИЯ: Если включены мокированные ответы для Cypress
+        # ЛИМИТ: слишком большой промпт отклоняется без запроса к API
         # ====================================================================
-        if Config.ENABLE_MOCKS:
-            print(f"🔧 MOCK MODE (Cypress): Возврат мокированного ответа")
-            
-            # Мокированные ответы для разных моделей
-            if "Qwen" in model_name:
-                print(f"📚 Mock перевод для модели Qwen")
-                return "The sun is shining."
-            elif "claude-sonnet" in model_name:
-                print(f"📚 Mock оценка для модели claude-sonnet")
-                return "Rating: 9/10. Fluent and accurate."
-            else:
-                print(f"📚 Mock ответ для неизвестной модели")
-                return "Mocked Response: Default answer"
+        if _prompt_too_large(prompt):
+            logger.warning("⚠️  Промпт превышает %d байт, запрос к API не отправлен", Config.MAX_PROMPT_BYTES)
+            return None
         
         # ====================================================================
-        # ОБЫЧНЫЙ РЕЖИМ: Реальный запрос к API
+        # КЭШ: повторный (или похожий) промпт не идет в сеть
+        # ====================================================================
+        cache_key, cached_response = self._cache_lookup(model_name, prompt)
+        if cached_response is not None:
+            return cached_response
+
+        # ====================================================================
+        # ВЫКЛЮЧАТЕЛЬ: API недавно был недоступен - не ждем таймаут снова
         # ====================================================================
+        if not self._breaker.allow():
+            logger.error("❌ API временно недоступен (circuit breaker), запрос не отправлен")
+            return None
+
+        # ====================================================================
+        # ОБЪЕДИНЕНИЕ: одинаковые одновременные запросы делят один вызов API
+        # ====================================================================
+        flight_key = cache_key or response_cache.make_key(model_name, prompt)
         
-        request_body = {
-            "model_name": model_name,
-            "prompt": prompt
-        }
+        return self._single_flight(
+            flight_key,
+            lambda: self._post(model_name, prompt, cache_key)
+        )
+
+    def _single_flight(self, key: str, request):
+        """
+        Выполняет request() один раз для всех одновременных вызовов с одним ключом.
+        
+        Первый поток ("лидер") регистрирует Future и делает запрос к API,
+        остальные потоки с тем же ключом ждут этот Future и получают тот же
+        ответ. При N одинаковых запросах (повторные отправки формы,
+        обновления страницы) к API уходит 1 запрос вместо N.
+        """
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._inflight[key] = future
+        
+        if not is_leader:
+            logger.debug("⏳ Ожидаем ответ на такой же запрос из другого потока")
+            return future.result()
+        
+        try:
+            result = request()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+
+    def _post(self, model_name: str, prompt: str, cache_key: Optional[str]) -> Optional[str]:
+        """
+        Отправляет запрос к API, разбирает ответ и сохраняет его в кэш.
+        """
         
         try:
-            print(f"📤 Отправка запроса к API...")
-            print(f"   Модель: {model_name}")
-            print(f"   Промпт: {prompt[:100]}...")
+            logger.debug("📤 Отправка запроса к API: модель %s, промпт %s", model_name, prompt)
             
-            response = requests.post(
+            # Тело передается готовыми bytes (Content-Type
+            # application/json уже задан в заголовках сессии)
+            response = self._session.post(
                 url=self.api_endpoint,
-                json=request_body,
-                headers=self.headers,
+                data=_encode_request_body(model_name, prompt),
                 timeout=self.timeout
             )
             
+            # Соединение установлено - API доступен
+            self._breaker.record_success()
+            
             if response.status_code >= 400:
-                print(f"❌ Ошибка API: {response.status_code}")
-                print(f"   Текст ошибки: {response.text}")
+                logger.error("❌ Ошибка API: %s, текст ошибки: %s", response.status_code, response.text)
                 return None
             
-            response_data = response.json()
+            try:
+                response_data = orjson.loads(response.content)
+            except orjson.JSONDecodeError:
+                logger.error("❌ Ошибка: Ответ сервера не является валидным JSON: %r", response.content[:200])
+                return None
             
-            if "response" not in response_data:
-                print(f"❌ Ошибка парсинга: ключ 'response' не найден в ответе")
-                print(f"   Полученный ответ: {response_data}")
+            if not isinstance(response_data, dict) or "response" not in response_data:
+                logger.error("❌ Ошибка парсинга: ключ 'response' не найден в ответе: %r", response_data)
                 return None
             
             llm_response = response_data["response"]
             
-            print(f"✅ Успешный ответ от API ({len(llm_response)} символов)")
+            logger.info("✅ Успешный ответ от API (%d символов)", len(llm_response))
+            
+            self._cache_store(cache_key, model_name, prompt, llm_response)
             
             return llm_response
         
+        except requests.exceptions.ConnectTimeout:
+            self._breaker.record_failure()
+            logger.error("❌ Ошибка: Не удалось подключиться к API за %s сек", Config.CONNECT_TIMEOUT)
+            return None
+        
         except requests.exceptions.Timeout:
-            print(f"❌ Ошибка: Таймаут запроса (сервер не ответил за {self.timeout} сек)")
+            # Соединение установлено, модель просто долго генерирует ответ:
+            # для выключателя это не ошибка подключения
+            self._breaker.record_success()
+            logger.error("❌ Ошибка: Таймаут запроса (сервер не ответил за %s сек)", Config.READ_TIMEOUT)
             return None
         
         except requests.exceptions.ConnectionError:
-            print(f"❌ Ошибка: Не удалось подключиться к API")
-            print(f"   Проверьте интернет соединение и доступность {self.api_endpoint}")
+            self._breaker.record_failure()
+            logger.error("❌ Ошибка: Не удалось подключиться к API %s", self.api_endpoint)
             return None
         
         except requests.exceptions.RequestException as e:
-            print(f"❌ Ошибка HTTP запроса: {str(e)}")
+            logger.error("❌ Ошибка HTTP запроса: %s", e)
             return None
         
-        except json.JSONDecodeError:
-            print(f"❌ Ошибка: Ответ сервера не является валидным JSON")
-            print(f"   Полученный текст: {response.text[:200]}")
+        except Exception as e:
+            logger.error("❌ Неизвестная ошибка: %s", e)
             return None
-        
+
+    async def _get_async_session(self) -> aiohttp.ClientSession:
+        """
+        Возвращает aiohttp-сессию текущего event loop, создавая ее при первом
+        обращении.
+
+        Сессия и ее пул соединений переиспользуются между вызовами acall_llm
+        внутри одного event loop, поэтому TCP/TLS рукопожатие выполняется
+        один раз, а не на каждый запрос. У каждого loop своя сессия: код,
+        работающий в нескольких loop (например, asyncio.run в разных
+        потоках), не закрывает сессию, которой пользуется другой loop.
+        Сессия закрывается только в своем loop при его остановке
+        (см. _close_on_loop_shutdown), поэтому соединения не утекают.
+
+        Между проверкой и созданием сессии нет точек await, поэтому внутри
+        одного loop гонки нет; блокировка защищает общий словарь сессий от
+        других потоков.
+        """
+        loop = asyncio.get_running_loop()
+
+        with self._async_sessions_lock:
+            entry = self._async_sessions.get(loop)
+            if entry is not None and not entry[0].closed:
+                return entry[0]
+
+            connector = aiohttp.TCPConnector(limit=64, keepalive_timeout=60)
+            session = aiohttp.ClientSession(connector=connector, headers=self._headers)
+            closer = _close_on_loop_shutdown(session, self._async_sessions)
+            self._async_sessions[loop] = (session, closer)
+
+        # Регистрируем закрытие сессии при остановке этого loop
+        await closer.asend(None)
+
+        return session
+
+    async def acall_llm(self, model_name: str, prompt: str) -> Optional[str]:
+        """
+        Асинхронная версия call_llm на базе aiohttp.
+
+        Позволяет async-коду выполнять несколько независимых запросов к LLM
+        одновременно (например, через asyncio.gather) и переиспользует один
+        пул соединений между вызовами. Контракт тот же, что у call_llm:
+        возвращает текст ответа или None при любой ошибке.
+        """
+
+        if self._mocks_enabled:
+            return self._call_mock(model_name, prompt)
+
+        if _prompt_too_large(prompt):
+            logger.warning("⚠️  Промпт превышает %d байт, запрос к API не отправлен", Config.MAX_PROMPT_BYTES)
+            return None
+
+        loop = asyncio.get_running_loop()
+
+        # Чтение кэша (SQLite) - блокирующий ввод-вывод, поэтому выполняется
+        # в пуле потоков, чтобы не останавливать event loop
+        if Config.LLM_CACHE_ENABLED or Config.SEMANTIC_CACHE_ENABLED:
+            cache_key, cached_response = await loop.run_in_executor(
+                None, self._cache_lookup, model_name, prompt
+            )
+            if cached_response is not None:
+                return cached_response
+        else:
+            cache_key = None
+
+        flight_key = cache_key or response_cache.make_key(model_name, prompt)
+
+        # Объединение одинаковых одновременных запросов (см. _single_flight).
+        # Внутри одного event loop блокировка не нужна: между проверкой
+        # словаря и регистрацией Future нет точек await
+        while True:
+            future = self._async_inflight.get(flight_key)
+            if future is None or future.get_loop() is not loop:
+                break
+
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                # Отменена задача-лидер, а не эта: запрос повторяется, и
+                # текущая задача сама становится лидером
+                logger.debug("⏳ Запрос-лидер отменен, повторяем запрос")
+
+        future = loop.create_future()
+        self._async_inflight[flight_key] = future
+
+        try:
+            result = await self._apost(model_name, prompt, cache_key)
+            future.set_result(result)
+            return result
+        except BaseException:
+            # _apost сам обрабатывает ошибки API, сюда попадает только
+            # отмена задачи - ожидающие вызовы повторят запрос сами
+            future.cancel()
+            raise
+        finally:
+            if self._async_inflight.get(flight_key) is future:
+                del self._async_inflight[flight_key]
+
+    async def _apost(self, model_name: str, prompt: str, cache_key: Optional[str]) -> Optional[str]:
+        """
+        Асинхронно отправляет запрос к API и разбирает ответ.
+        """
+
+        if not self._breaker.allow():
+            logger.error("❌ API временно недоступен (circuit breaker), запрос не отправлен")
+            return None
+
+        try:
+            session = await self._get_async_session()
+
+            async with session.post(
+                self.api_endpoint,
+                data=_encode_request_body(model_name, prompt),
+                timeout=self._async_timeout
+            ) as response:
+                self._breaker.record_success()
+
+                if response.status >= 400:
+                    logger.error("❌ Ошибка API: %s, текст ошибки: %s", response.status, await response.text())
+                    return None
+
+                body = await response.read()
+
+            try:
+                response_data = orjson.loads(body)
+            except orjson.JSONDecodeError:
+                logger.error("❌ Ошибка: Ответ сервера не является валидным JSON: %r", body[:200])
+                return None
+
+            if not isinstance(response_data, dict) or "response" not in response_data:
+                logger.error("❌ Ошибка парсинга: ключ 'response' не найден в ответе: %r", response_data)
+                return None
+
+            llm_response = response_data["response"]
+
+            logger.info("✅ Успешный ответ от API (%d символов)", len(llm_response))
+
+            if cache_key is not None or Config.SEMANTIC_CACHE_ENABLED:
+                await asyncio.get_running_loop().run_in_executor(
+                    None, self._cache_store, cache_key, model_name, prompt, llm_response
+                )
+
+            return llm_response
+
+        # Исключения таймаутов aiohttp наследуют asyncio.TimeoutError,
+        # поэтому конкретные классы перехватываются раньше него
+        except _AIOHTTP_READ_TIMEOUT:
+            # Соединение установлено, модель долго генерирует ответ
+            self._breaker.record_success()
+            logger.error("❌ Ошибка: Таймаут запроса (сервер не ответил за %s сек)", Config.READ_TIMEOUT)
+            return None
+
+        except aiohttp.ServerTimeoutError:
+            self._breaker.record_failure()
+            logger.error("❌ Ошибка: Не удалось подключиться к API за %s сек", Config.CONNECT_TIMEOUT)
+            return None
+
+        except aiohttp.ClientConnectionError:
+            # ClientConnectorError (хост недоступен) и обрыв соединения -
+            # как requests.exceptions.ConnectionError в _post
+            self._breaker.record_failure()
+            logger.error("❌ Ошибка: Не удалось подключиться к API %s", self.api_endpoint)
+            return None
+
+        except asyncio.TimeoutError:
+            # Общий таймаут запроса (total) - как requests.exceptions.Timeout в _post
+            self._breaker.record_success()
+            logger.error("❌ Ошибка: Таймаут запроса (сервер не ответил за %s сек)", Config.READ_TIMEOUT)
+            return None
+
+        except aiohttp.ClientError as e:
+            logger.error("❌ Ошибка HTTP запроса: %s", e)
+            return None
+
         except Exception as e:
-            print(f"❌ Неизвестная ошибка: {str(e)}")
+            logger.error("❌ Неизвестная ошибка: %s", e)
             return None
 
+    def call_llm_stream(self, model_name: str, prompt: str) -> Iterator[str]:
+        """
+        Потоковый вызов LLM: возвращает части ответа по мере их получения.
+        
+        Если API отвечает в формате server-sent events
+        (Content-Type: text/event-stream), каждая строка "data: {...}"
+        содержит очередной фрагмент в поле "delta". Если API вернул обычный
+        JSON ответ, он выдается одним фрагментом - поэтому метод работает
+        с любым режимом API.
+        
+        При любой ошибке (ответ 4xx/5xx, таймаут, недоступный API, слишком
+        большой промпт) ошибка пишется в лог и генератор выбрасывает
+        LLMStreamError - так вызывающий код отличает сбой от пустого ответа.
+        Полностью полученный ответ сохраняется в кэш как у call_llm.
+        """
+        
+        if self._mocks_enabled:
+            yield self._call_mock(model_name, prompt)
+            return
+        
+        if _prompt_too_large(prompt):
+            logger.warning("⚠️  Промпт превышает %d байт, запрос к API не отправлен", Config.MAX_PROMPT_BYTES)
+            raise LLMStreamError("Промпт слишком большой")
+        
+        cache_key, cached_response = self._cache_lookup(model_name, prompt)
+        if cached_response is not None:
+            yield cached_response
+            return
+        
+        if not self._breaker.allow():
+            logger.error("❌ API временно недоступен (circuit breaker), запрос не отправлен")
+            raise LLMStreamError("API временно недоступен")
+        
+        chunks = []
+        connected = False
+        
+        try:
+            with self._session.post(
+                url=self.api_endpoint,
+                data=_encode_request_body(model_name, prompt),
+                timeout=self.timeout,
+                stream=True
+            ) as response:
+                connected = True
+                self._breaker.record_success()
+                
+                if response.status_code >= 400:
+                    logger.error("❌ Ошибка API: %s, текст ошибки: %s", response.status_code, response.text)
+                    raise LLMStreamError("Ошибка API: %s" % response.status_code)
+                
+                content_type = response.headers.get("Content-Type", "")
+                
+                if not content_type.startswith("text/event-stream"):
+                    # API не поддерживает потоковый режим - обычный JSON ответ
+                    response_data = orjson.loads(response.content)
+                    if not isinstance(response_data, dict) or "response" not in response_data:
+                        logger.error("❌ Ошибка парсинга: ключ 'response' не найден в ответе: %r", response_data)
+                        raise LLMStreamError("Некорректный ответ API")
+                    chunks.append(response_data["response"])
+                    yield response_data["response"]
+                else:
+                    for line in response.iter_lines():
+                        if not line.startswith(b"data: "):
+                            continue
+                        
+                        payload = line[6:]
+                        if payload == b"[DONE]":
+                            break
+                        
+                        delta = orjson.loads(payload).get("delta")
+                        if delta:
+                            chunks.append(delta)
+                            yield delta
+        
+        except LLMStreamError:
+            raise
+        
+        except requests.exceptions.ConnectTimeout:
+            self._breaker.record_failure()
+            logger.error("❌ Ошибка: Не удалось подключиться к API за %s сек", Config.CONNECT_TIMEOUT)
+            raise LLMStreamError("Не удалось подключиться к API") from None
+        
+        except requests.exceptions.Timeout:
+            logger.error("❌ Ошибка: Таймаут запроса (сервер не ответил за %s сек)", Config.READ_TIMEOUT)
+            raise LLMStreamError("Таймаут запроса") from None
+        
+        except requests.exceptions.ConnectionError:
+            # Обрыв или таймаут во время чтения потока - соединение было
+            # установлено, поэтому выключатель его не учитывает
+            if connected:
+                logger.error("❌ Ошибка: Поток ответа API прерван")
+                raise LLMStreamError("Поток ответа прерван") from None
+            
+            self._breaker.record_failure()
+            logger.error("❌ Ошибка: Не удалось подключиться к API %s", self.api_endpoint)
+            raise LLMStreamError("Не удалось подключиться к API") from None
+        
+        except requests.exceptions.RequestException as e:
+            logger.error("❌ Ошибка HTTP запроса: %s", e)
+            raise LLMStreamError("Ошибка HTTP запроса") from None
+        
+        except Exception as e:
+            logger.error("❌ Ошибка потокового ответа: %s", e)
+            raise LLMStreamError("Ошибка потокового ответа") from None
+        
+        if chunks:
+            self._cache_store(cache_key, model_name, prompt, "".join(chunks))
+
+    def submit_llm(self, model_name: str, prompt: str) -> Future:
+        """
+        Запускает call_llm в фоновом потоке и сразу возвращает Future.
+        
+        Нужен, когда у вызывающего кода есть НЕСКОЛЬКО НЕЗАВИСИМЫХ запросов:
+        пока поток ждет ответ сети (socket.recv отпускает GIL), другие
+        запросы выполняются параллельно. Результат: future.result().
+        
+        Пример:
+            futures = [client.submit_llm(model, p) for p in prompts]
+            results = [f.result() for f in futures]
+        """
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=16,
+                    thread_name_prefix="llm-client"
+                )
+        
+        return self._executor.submit(self.call_llm, model_name, prompt)
+
+    def close(self) -> None:
+        """
+        Закрывает HTTP сессию и освобождает соединения из пула.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        self._session.close()
+
+    def __del__(self):
+        session = getattr(self, "_session", None)
+        if session is not None:
+            session.close()
+
+    async def aclose(self) -> None:
+        """
+        Закрывает асинхронную сессию текущего event loop (вызывать при
+        остановке async-приложения).
+        """
+        with self._async_sessions_lock:
+            entry = self._async_sessions.pop(asyncio.get_running_loop(), None)
+
+        if entry is not None:
+            session, closer = entry
+            await closer.aclose()
+            if not session.closed:
+                await session.close()
+
+
+# Клиент создается при первом вызове, а не при импорте модуля: импорт
+# (например, в тестах или при --collect-only) не открывает HTTP сессию
+_client: Optional[LLMClient] = None
+_client_lock = threading.Lock()
+
+
+def _get_client() -> LLMClient:
+    """
+    Возвращает общий экземпляр LLMClient, создавая его при первом обращении.
+    """
+    global _client
+
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = LLMClient()
+
+    return _client
+
+
+def reset_client_for_tests() -> None:
+    """
+    Закрывает и сбрасывает общий клиент. Следующий вызов создаст новый
+    LLMClient с текущими значениями Config (нужно тестам, меняющим Config).
+    """
+    global _client
+
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
 
-client = LLMClient()
 
 def call_llm(model_name: str, prompt: str) -> Optional[str]:
     """
     Функция-обертка для вызова LLM.
     """
-    return client.call_llm(model_name, prompt)
+    return _get_client().call_llm(model_name, prompt)
+
+
+def call_llm_stream(model_name: str, prompt: str) -> Iterator[str]:
+    """
+    Функция-обертка для потокового вызова LLM.
+    """
+    return _get_client().call_llm_stream(model_name, prompt)
+
+
+def submit_llm(model_name: str, prompt: str) -> Future:
+    """
+    Функция-обертка для фонового вызова LLM (возвращает Future).
+    """
+    return _get_client().submit_llm(model_name, prompt)
+
+
+async def acall_llm(model_name: str, prompt: str) -> Optional[str]:
+    """
+    Асинхронная функция-обертка для вызова LLM.
+    """
+    return await _get_client().acall_llm(model_name, prompt)
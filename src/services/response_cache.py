@@ -0,0 +1,252 @@
+# ============================================================================
+# response_cache.py - Персистентный кэш ответов LLM (SQLite)
+# ============================================================================
+# Этот модуль хранит ответы LLM по ключу (модель, промпт). Если пользователь
+# повторно отправляет тот же самый текст, ответ берется из кэша за
+# микросекунды вместо многосекундного запроса к API.
+#
+# Устройство:
+# - Ключ: SHA-256 от нормализованной пары (model_name, prompt)
+# - Хранилище: SQLite файл (Config.LLM_CACHE_PATH) в режиме WAL, перед ним
+#   небольшой кэш в памяти процесса (Config.LLM_MEMORY_CACHE_TTL секунд)
+# - Устаревание: записи старше Config.LLM_CACHE_TTL секунд не возвращаются
+# - Вытеснение: при превышении Config.LLM_CACHE_MAX_ENTRIES удаляются
+#   записи, которые дольше всех не использовались (LRU)
+#
+# Начинающим QA-специалистам: кэш безопасен для перевода и оценки, потому что
+# оба запроса не имеют побочных эффектов - одинаковый вход дает тот же ответ.
+# ============================================================================
+
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Optional, Tuple
+from src.config import Config
+
+
+logger = logging.getLogger(__name__)
+
+_connection: Optional[sqlite3.Connection] = None
+_connection_path: Optional[str] = None
+_lock = threading.Lock()
+
+# Кэш в памяти: key -> (created_at, inserted_at, response), порядок - от
+# давно использованных к недавним. created_at - время создания ответа (как
+# в SQLite), inserted_at - время попадания записи в память. Защищен своей блокировкой, чтобы попадание
+# в память не ждало запросов к SQLite.
+_memory: "OrderedDict[str, Tuple[int, int, str]]" = OrderedDict()
+_memory_lock = threading.Lock()
+
+
+def make_key(model_name: str, prompt: str) -> str:
+    """
+    Строит ключ кэша для пары (модель, промпт).
+
+    Нормализация:
+        1. Промпт приводится к Unicode NFC и очищается от крайних пробелов
+        2. Внутри каждой строки промпта серии пробелов/табуляций сжимаются
+           до одного пробела (переносы строк сохраняются)
+        3. Имя модели очищается от пробелов и приводится к нижнему регистру
+
+    Регистр промпта не меняется: "Apple" и "apple" могут требовать
+    разного перевода, поэтому это разные ключи.
+
+    Возвращает:
+        str: hex-строка SHA-256
+    """
+    normalized_model = model_name.strip().lower()
+    normalized_prompt = "\n".join(
+        " ".join(line.split())
+        for line in unicodedata.normalize("NFC", prompt).strip().splitlines()
+    )
+
+    payload = json.dumps(
+        {"m": normalized_model, "p": normalized_prompt},
+        sort_keys=True,
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _get_connection() -> sqlite3.Connection:
+    """
+    Возвращает соединение с SQLite, открывая его при первом обращении.
+    Вызывается только под _lock.
+    """
+    global _connection, _connection_path
+
+    if _connection is not None and _connection_path == Config.LLM_CACHE_PATH:
+        return _connection
+
+    if _connection is not None:
+        _connection.close()
+
+    connection = sqlite3.connect(
+        Config.LLM_CACHE_PATH,
+        check_same_thread=False,
+        isolation_level=None
+    )
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS cache ("
+        "key TEXT PRIMARY KEY, "
+        "model TEXT, "
+        "response TEXT, "
+        "created_at INTEGER, "
+        "last_used INTEGER)"
+    )
+    connection.execute(
+        "CREATE INDEX IF NOT EXISTS idx_cache_last_used ON cache (last_used)"
+    )
+
+    _connection = connection
+    _connection_path = Config.LLM_CACHE_PATH
+    return connection
+
+
+def _memory_get(key: str, now: int) -> Optional[str]:
+    """
+    Возвращает ответ из кэша в памяти или None, если записи нет или она
+    устарела: лежит в памяти дольше Config.LLM_MEMORY_CACHE_TTL или сам
+    ответ старше Config.LLM_CACHE_TTL.
+    """
+    with _memory_lock:
+        entry = _memory.get(key)
+        if entry is None:
+            return None
+
+        created_at, inserted_at, response = entry
+        if (now - inserted_at > Config.LLM_MEMORY_CACHE_TTL
+                or now - created_at > Config.LLM_CACHE_TTL):
+            del _memory[key]
+            return None
+
+        _memory.move_to_end(key)
+        return response
+
+
+def _memory_set(key: str, value: str, created_at: int, now: int) -> None:
+    """
+    Сохраняет ответ в кэш в памяти и вытесняет давно не использованные
+    записи. Размер не превышает и лимит SQLite кэша, чтобы в памяти не
+    оставались записи, уже вытесненные из файла.
+    """
+    max_entries = min(Config.LLM_MEMORY_CACHE_MAX_ENTRIES, Config.LLM_CACHE_MAX_ENTRIES)
+
+    with _memory_lock:
+        _memory[key] = (created_at, now, value)
+        _memory.move_to_end(key)
+        while len(_memory) > max_entries:
+            _memory.popitem(last=False)
+
+
+def get(key: str) -> Optional[str]:
+    """
+    Возвращает закэшированный ответ по ключу или None, если записи нет
+    или она устарела (старше Config.LLM_CACHE_TTL).
+
+    Сначала проверяется кэш в памяти, затем SQLite; ответ, найденный
+    в SQLite, копируется в память для следующих обращений.
+    """
+    now = int(time.time())
+
+    response = _memory_get(key, now)
+    if response is not None:
+        return response
+
+    try:
+        with _lock:
+            connection = _get_connection()
+            row = connection.execute(
+                "SELECT response, created_at FROM cache WHERE key = ?",
+                (key,)
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            response, created_at = row
+
+            if now - created_at > Config.LLM_CACHE_TTL:
+                connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return None
+
+            connection.execute(
+                "UPDATE cache SET last_used = ? WHERE key = ?",
+                (now, key)
+            )
+
+    except sqlite3.Error as e:
+        logger.warning("⚠️  Кэш LLM недоступен: %s", e)
+        return None
+
+    _memory_set(key, response, created_at, now)
+    return response
+
+
+def set(key: str, value: str, model: str) -> None:
+    """
+    Сохраняет ответ модели в кэш и вытесняет старые записи при переполнении.
+    """
+    now = int(time.time())
+
+    _memory_set(key, value, now, now)
+
+    try:
+        with _lock:
+            connection = _get_connection()
+            connection.execute(
+                "INSERT OR REPLACE INTO cache "
+                "(key, model, response, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, model, value, now, now)
+            )
+            _evict(connection)
+
+    except sqlite3.Error as e:
+        logger.warning("⚠️  Не удалось сохранить ответ в кэш LLM: %s", e)
+
+
+def _evict(connection: sqlite3.Connection) -> None:
+    """
+    Удаляет записи, которые дольше всех не использовались, если их
+    больше Config.LLM_CACHE_MAX_ENTRIES.
+    """
+    max_entries = Config.LLM_CACHE_MAX_ENTRIES
+
+    (count,) = connection.execute("SELECT COUNT(*) FROM cache").fetchone()
+    if count <= max_entries:
+        return
+
+    # last_used самой старой записи, которая еще помещается в лимит
+    row = connection.execute(
+        "SELECT last_used FROM cache ORDER BY last_used DESC LIMIT 1 OFFSET ?",
+        (max_entries - 1,)
+    ).fetchone()
+
+    if row is not None:
+        connection.execute("DELETE FROM cache WHERE last_used < ?", (row[0],))
+
+
+def close() -> None:
+    """
+    Закрывает соединение с SQLite и очищает кэш в памяти
+    (полезно в тестах и при остановке).
+    """
+    global _connection, _connection_path
+
+    with _memory_lock:
+        _memory.clear()
+
+    with _lock:
+        if _connection is not None:
+            _connection.close()
+        _connection = None
+        _connection_path = None
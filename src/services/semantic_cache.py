@@ -0,0 +1,210 @@
+# ============================================================================
+# semantic_cache.py - Семантический кэш ответов LLM (TF-IDF + косинус)
+# ============================================================================
+# Точный кэш (response_cache.py) срабатывает только на байт-в-байт
+# одинаковых промптах. Семантический кэш находит ПОХОЖИЕ промпты
+# ("Hello world" и "hello world!") и возвращает сохраненный ответ, если
+# косинусное сходство выше порога.
+#
+# Устройство (только стандартная библиотека, без тяжелых зависимостей):
+# - Шаблон промпта отбрасывается: у запроса и сохраненного промпта
+#   убираются общие начальные и конечные строки (инструкция "Translate the
+#   following text to ...", формат ответа), сравниваются только отличающиеся
+#   строки - текст пользователя. Промпты без общей первой строки (другой
+#   шаблон или другой язык перевода) не сравниваются вовсе
+# - Оставшийся текст разбивается на слова в нижнем регистре (пунктуация
+#   отбрасывается); вес слова = частота * сглаженный IDF
+#   log((1 + N) / (1 + df)) + 1, поэтому даже при одной записи и для слов,
+#   общих для всех записей, вес остается положительным
+# - Для каждой модели свой набор записей, чтобы перевод Qwen не вернулся
+#   как оценка Claude
+# - При превышении max_size удаляются самые старые записи
+#
+# Начинающим QA-специалистам: кэш выключен по умолчанию
+# (SEMANTIC_CACHE_ENABLED=1 чтобы включить), т.к. похожий текст не всегда
+# означает одинаковый перевод.
+# ============================================================================
+
+
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, Optional, Set
+
+
+_WORD = re.compile(r"\w+")
+
+
+def _tokenize(text: str) -> Counter:
+    """
+    Разбивает текст на слова в нижнем регистре и считает их частоты.
+    """
+    return Counter(word.lower() for word in _WORD.findall(text))
+
+
+def _strip_template(query_lines: tuple, entry_lines: tuple) -> Optional[tuple]:
+    """
+    Убирает общие начальные и конечные строки двух промптов (шаблон).
+
+    Возвращает (текст запроса, текст записи) без шаблона или None, если
+    у промптов разная первая строка - это разные шаблоны или разные
+    параметры шаблона (например, язык перевода) и сравнивать их нельзя.
+    """
+    if not query_lines or not entry_lines or query_lines[0] != entry_lines[0]:
+        return None
+
+    shortest = min(len(query_lines), len(entry_lines))
+
+    prefix = 0
+    while prefix < shortest and query_lines[prefix] == entry_lines[prefix]:
+        prefix += 1
+
+    suffix = 0
+    while (suffix < shortest - prefix
+           and query_lines[-1 - suffix] == entry_lines[-1 - suffix]):
+        suffix += 1
+
+    return (
+        "\n".join(query_lines[prefix:len(query_lines) - suffix]),
+        "\n".join(entry_lines[prefix:len(entry_lines) - suffix])
+    )
+
+
+class _ModelBucket:
+    """
+    Записи семантического кэша для одной модели.
+
+    Хранит частоты слов каждого промпта, document frequency для IDF и
+    обратный индекс (слово -> записи), чтобы сравнивать запрос только
+    с промптами, у которых есть общие слова.
+    """
+
+    def __init__(self):
+        # entry_id -> (частоты слов всего промпта, строки промпта, ответ)
+        self.entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self.document_frequency: Counter = Counter()
+        self.postings: Dict[str, Set[int]] = {}
+        self._next_id = 0
+
+    def _idf(self, word: str) -> float:
+        documents = len(self.entries)
+        return math.log((1 + documents) / (1 + self.document_frequency[word])) + 1
+
+    def add(self, lines: tuple, response: str, max_size: int) -> None:
+        entry_id = self._next_id
+        self._next_id += 1
+
+        term_frequency = _tokenize("\n".join(lines))
+        self.entries[entry_id] = (term_frequency, lines, response)
+        for word in term_frequency:
+            self.document_frequency[word] += 1
+            self.postings.setdefault(word, set()).add(entry_id)
+
+        while len(self.entries) > max_size:
+            old_id, (old_frequency, _, _) = self.entries.popitem(last=False)
+            for word in old_frequency:
+                self.document_frequency[word] -= 1
+                if self.document_frequency[word] <= 0:
+                    del self.document_frequency[word]
+                self.postings[word].discard(old_id)
+                if not self.postings[word]:
+                    del self.postings[word]
+
+    def _candidates(self, term_frequency: Counter) -> Set[int]:
+        """
+        Записи, с которыми стоит сравнивать запрос.
+
+        Слова шаблона есть во всех записях, поэтому кандидаты берутся
+        по более редким словам запроса; если таких нет - по всем словам.
+        """
+        documents = len(self.entries)
+        rare_words = [word for word in term_frequency if 0 < self.document_frequency[word] < documents]
+
+        candidates: Set[int] = set()
+        for word in rare_words or term_frequency:
+            candidates |= self.postings.get(word, set())
+        return candidates
+
+    def _similarity(self, query_text: Counter, entry_text: Counter) -> float:
+        """
+        Косинусное сходство текстов с весами частота * IDF.
+        """
+        if not query_text and not entry_text:
+            # Отличаются только пробелами/пунктуацией (или совпадают)
+            return 1.0
+
+        query = {word: count * self._idf(word) for word, count in query_text.items()}
+        entry = {word: count * self._idf(word) for word, count in entry_text.items()}
+
+        query_norm = math.sqrt(sum(weight * weight for weight in query.values()))
+        entry_norm = math.sqrt(sum(weight * weight for weight in entry.values()))
+        if query_norm == 0 or entry_norm == 0:
+            return 0.0
+
+        dot = sum(weight * entry[word] for word, weight in query.items() if word in entry)
+        return dot / (query_norm * entry_norm)
+
+    def best_match(self, lines: tuple) -> tuple:
+        """
+        Возвращает (сходство, ответ) для самого похожего промпта.
+        """
+        best_score, best_response = 0.0, None
+
+        for entry_id in self._candidates(_tokenize("\n".join(lines))):
+            _, entry_lines, response = self.entries[entry_id]
+
+            texts = _strip_template(lines, entry_lines)
+            if texts is None:
+                continue
+
+            score = self._similarity(_tokenize(texts[0]), _tokenize(texts[1]))
+            if score > best_score:
+                best_score, best_response = score, response
+
+        return best_score, best_response
+
+
+class SemanticCache:
+    """
+    Семантический кэш: возвращает ответ для промпта, похожего на уже
+    обработанный, если косинусное сходство >= threshold.
+    """
+
+    def __init__(self, threshold: float = 0.92, max_size: int = 5000):
+        self.threshold = threshold
+        self.max_size = max_size
+        self._buckets: Dict[str, _ModelBucket] = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_name: str, prompt: str) -> Optional[str]:
+        """
+        Возвращает ответ для похожего промпта той же модели или None.
+        """
+        lines = tuple(prompt.strip().splitlines())
+
+        with self._lock:
+            bucket = self._buckets.get(model_name)
+            if bucket is None:
+                return None
+
+            score, response = bucket.best_match(lines)
+
+        return response if score >= self.threshold else None
+
+    def add(self, model_name: str, prompt: str, response: str) -> None:
+        """
+        Запоминает ответ модели на промпт.
+        """
+        lines = tuple(prompt.strip().splitlines())
+
+        with self._lock:
+            bucket = self._buckets.setdefault(model_name, _ModelBucket())
+            bucket.add(lines, response, self.max_size)
+
+    def clear(self) -> None:
+        """
+        Удаляет все записи (полезно в тестах).
+        """
+        with self._lock:
+            self._buckets.clear()
@@ -0,0 +1,163 @@
+# ============================================================================
+# conftest.py - Общие фикстуры для юнит-тестов
+# ============================================================================
+# pytest автоматически подключает этот файл ко всем тестам в директории.
+# Здесь находятся фикстуры, которые нужны нескольким тестовым файлам.
+#
+# Flask приложение импортируется здесь один раз на весь прогон тестов,
+# и тестовый клиент тоже создается один раз на весь прогон, а не на каждый тест.
+#
+# Начинающим QA-специалистам: фикстуры из conftest.py не нужно
+# импортировать - достаточно указать их имя в аргументах теста.
+# ============================================================================
+
+import pytest
+from types import SimpleNamespace
+from unittest import mock
+from src.app import app
+from src.config import Config
+from src.services import response_cache
+
+
+def _make_api_response(status_code: int, content: bytes = b"", text: str = "") -> SimpleNamespace:
+    """
+    Создает легкую замену requests.Response для mock_post.
+    
+    LLM клиент читает у ответа только status_code, content и text, поэтому
+    вместо Mock достаточно простого объекта с этими атрибутами: у него нет
+    накладных расходов Mock на каждое обращение. Mock нужен только там,
+    где тест проверяет вызовы (call_args) - например, для самого post.
+    """
+    
+    return SimpleNamespace(status_code=status_code, content=content, text=text)
+
+
+@pytest.fixture(scope="session")
+def api_response():
+    """
+    Фабрика легких ответов API для фикстур тестовых файлов.
+    
+    Пример использования:
+        def test_example(mock_post, api_response):
+            mock_post.return_value = api_response(200, b'{"response": "ok"}')
+    """
+    
+    return _make_api_response
+
+
+@pytest.fixture(scope="session", autouse=True)
+def app_config():
+    """
+    Фикстура настраивает Flask приложение для тестов один раз за прогон.
+    
+    Что происходит:
+    1. Отключаем проверку CSRF токенов (для тестирования)
+    2. Включаем test mode для лучшей обработки исключений
+    """
+    
+    app.config['WTF_CSRF_ENABLED'] = False
+    app.config['TESTING'] = True
+
+
+@pytest.fixture(scope="session", autouse=True)
+def worker_cache_path(tmp_path_factory):
+    """
+    Фикстура направляет SQLite кэш ответов LLM во временный файл прогона.
+    
+    Без нее тест, включивший кэш, писал бы в общий llm_cache.sqlite3
+    в корне проекта. При параллельном запуске (pytest -n auto, pytest-xdist)
+    tmp_path_factory выдает каждому воркеру свою директорию, поэтому
+    воркеры не делят файл кэша и не влияют на результаты друг друга.
+    """
+    
+    original_path = Config.LLM_CACHE_PATH
+    Config.LLM_CACHE_PATH = str(tmp_path_factory.mktemp("llm_cache") / "llm_cache.sqlite3")
+    
+    yield Config.LLM_CACHE_PATH
+    
+    response_cache.close()
+    Config.LLM_CACHE_PATH = original_path
+
+
+@pytest.fixture(autouse=True)
+def fast_render(request):
+    """
+    Фикстура заменяет рендеринг Jinja шаблонов на строку с контекстом.
+    
+    Большинство тестов проверяет только данные, которые маршрут передал
+    в шаблон (перевод, оценку, сообщение об ошибке), поэтому сборка
+    HTML страницы им не нужна. Mock возвращает "index.html: {...контекст...}",
+    и эти значения по-прежнему видны в response.data.
+    
+    Тестам, которым нужна настоящая HTML страница, достаточно пометки
+    @pytest.mark.real_render.
+    """
+    
+    if request.node.get_closest_marker("real_render"):
+        yield None
+        return
+    
+    with mock.patch(
+        "src.app.render_template",
+        side_effect=lambda template_name, **context: f"{template_name}: {context}"
+    ) as render:
+        yield render
+
+
+@pytest.fixture(scope="session")
+def client(app_config):
+    """
+    Фикстура для создания тестового клиента Flask (один на весь прогон).
+    
+    Тесты не меняют app.config и состояние приложения, поэтому один клиент
+    можно безопасно переиспользовать во всех тестовых файлах - это
+    экономит время на каждом тесте. Если тесту нужно поменять настройки,
+    он делает это через monkeypatch, который откатывает изменения.
+    
+    Возвращает:
+        FlaskClient: объект для отправки HTTP запросов в тестах
+    
+    Пример использования в тесте:
+        def test_example(client):
+            response = client.get('/')
+            assert response.status_code == 200
+    """
+    
+    with app.test_client() as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def translation_response():
+    """
+    Готовый mock ответа API на запрос перевода (один на весь прогон).
+    
+    Тесты только читают status_code и content, поэтому объект можно
+    создать один раз и переиспользовать в любом тесте.
+    Если тесту нужно изменить ответ, он берет копию: copy.copy(fixture).
+    """
+    
+    return _make_api_response(200, b'{"response": "Translated text"}')
+
+
+@pytest.fixture(scope="session")
+def rating_response():
+    """
+    Готовый mock ответа API на запрос оценки перевода (один на весь прогон).
+    """
+    
+    return _make_api_response(200, b'{"response": "Rating: 9/10"}')
+
+
+@pytest.fixture
+def mock_post():
+    """
+    Фикстура подменяет отправку HTTP запросов к LLM API на mock.
+    
+    Один patch на тест вместо декоратора @mock.patch над каждым тестом:
+    тест просто указывает mock_post в аргументах и настраивает его
+    return_value или side_effect. После теста patch снимается.
+    """
+    
+    with mock.patch('src.services.llm_client.requests.Session.post') as patched_post:
+        yield patched_post
@@ -17,15 +17,35 @@
 
 import pytest
 import os
+import re
+import socket
+import asyncio
+import aiohttp
+import threading
+import time
+import orjson
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest import mock
 from src.app import (
-    app,
     validate_translation_input,
     build_translation_prompt,
-    build_evaluation_prompt
+    build_evaluation_prompt,
+    build_combined_prompt,
+    parse_combined_response,
+    translate_and_rate
 )
 from src.config import Config
-from src.services.llm_client import call_llm
+from src.services.llm_client import (
+    LLMClient,
+    LLMStreamError,
+    call_llm,
+    acall_llm,
+    call_llm_stream,
+    submit_llm,
+    _get_client,
+    reset_client_for_tests
+)
 
 
 # ============================================================================
@@ -34,48 +54,34 @@ from src.services.llm_client import call_llm
 # Фикстуры - это вспомогательные объекты, которые используются во всех тестах.
 # Они инициализируются перед каждым тестом и удаляются после.
 # Это помогает избежать дублирования кода.
+# Общие фикстуры (например, client) находятся в conftest.py.
+# Mock-ответы API только читаются тестами и не изменяются, поэтому
+# создаются один раз на модуль (scope="module").
 # Начинающим QA-специалистам: фикстуры - это как "подготовка к тесту"
 
-@pytest.fixture
-def client():
+@pytest.fixture(autouse=True)
+def disable_response_cache(monkeypatch):
     """
-    Фикстура для создания тестового клиента Flask.
-    
-    Что происходит:
-    1. Создаем Flask test client
-    2. Отключаем проверку CSRF токенов (для тестирования)
-    3. Используем test mode для лучшей обработки исключений
+    Фикстура отключает кэш ответов LLM для всех тестов этого файла.
     
-    Возвращает:
-        FlaskClient: объект для отправки HTTP запросов в тестах
-    
-    Пример использования в тесте:
-        def test_example(client):
-            response = client.get('/')
-            assert response.status_code == 200
+    Тесты используют одинаковые промпты с разными mock-ответами, поэтому
+    ответ, закэшированный одним тестом, не должен влиять на другой.
     """
     
-    # Отключаем проверку CSRF для тестирования
-    app.config['WTF_CSRF_ENABLED'] = False
-    app.config['TESTING'] = True
-    
-    # Создаем тестовый клиент
-    with app.test_client() as test_client:
-        yield test_client
+    monkeypatch.setattr(Config, "LLM_CACHE_ENABLED", False)
 
 
-@pytest.fixture
-def mock_api_response_success():
+@pytest.fixture(scope="module")
+def mock_api_response_success(api_response):
     """
     Фикстура для мокирования успешного ответа от API.
     
     Что происходит:
-    1. Создаем mock объект, который имитирует успешный HTTP ответ
-    2. Устанавливаем status_code = 200 (OK)
-    3. Настраиваем метод json() для возврата фиктивного текста
+    1. Создаем легкий объект, который имитирует requests.Response
+    2. Задаем status_code = 200 (OK) и тело ответа (content) - JSON в виде байтов
     
     Возвращает:
-        Mock: объект, который имитирует requests.Response
+        SimpleNamespace: объект, который имитирует requests.Response
     
     Пример структуры ответа API:
         {
@@ -83,16 +89,11 @@ def mock_api_response_success():
         }
     """
     
-    mock_response = mock.Mock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = {
-        "response": "This is a translated text"
-    }
-    return mock_response
+    return api_response(200, b'{"response": "This is a translated text"}')
 
 
-@pytest.fixture
-def mock_api_response_error():
+@pytest.fixture(scope="module")
+def mock_api_response_error(api_response):
     """
     Фикстура для мокирования ошибки API (500 Internal Server Error).
     
@@ -104,29 +105,33 @@ def mock_api_response_error():
     Это симулирует ситуацию, когда сервер выбросил исключение.
     """
     
-    mock_response = mock.Mock()
-    mock_response.status_code = 500
-    mock_response.text = "Internal Server Error"
-    return mock_response
+    return api_response(500, text="Internal Server Error")
 
 
-@pytest.fixture
-def mock_api_response_invalid_json():
+@pytest.fixture(scope="module")
+def mock_api_response_invalid_json(api_response):
     """
     Фикстура для мокирования невалидного JSON ответа.
     
     Что происходит:
     1. Создаем mock объект с status_code = 200 (выглядит успешно)
-    2. Но метод json() выбрасывает исключение JSONDecodeError
+    2. Но тело ответа (content) не является валидным JSON
     
     Это симулирует ситуацию, когда сервер вернул неправильный JSON.
     """
     
-    mock_response = mock.Mock()
-    mock_response.status_code = 200
-    mock_response.text = "This is not valid JSON"
-    mock_response.json.side_effect = ValueError("Invalid JSON")
-    return mock_response
+    return api_response(
+        200,
+        content=b"This is not valid JSON",
+        text="This is not valid JSON"
+    )
+
+
+# Признаки в HTML, которые тесты ищут прямо в байтах response.data, не
+# декодируя страницу. Шаблон с альтернативами проверяется за один
+# проход и компилируется один раз при импорте модуля.
+# Форма перевода (кнопка "Перевести" или поле text):
+_FORM_MARKER = re.compile('Перевести|value="text"'.encode())
 
 
 # ============================================================================
@@ -140,6 +145,7 @@ class TestPositiveScenarios:
     Группа тестов для проверки успешных сценариев работы приложения.
     """
     
+    @pytest.mark.real_render
     def test_homepage_loads_successfully(self, client):
         """
         Тест 1.1: Проверка загрузки главной страницы (GET /)
@@ -170,30 +176,54 @@ class TestPositiveScenarios:
             "Заголовок приложения не найден в HTML"
         
         # Проверяем, что форма содержит кнопку "Перевести"
-        response_text = response.data.decode('utf-8')
-        assert 'Перевести' in response_text or \
-               'value="text"' in response_text, \
+        assert _FORM_MARKER.search(response.data), \
             "Кнопка 'Перевести' или форма не найдена"
     
-    @mock.patch('src.services.llm_client.requests.post')
+    @pytest.mark.real_render
+    def test_homepage_wires_stream_translation(self, client, monkeypatch):
+        """
+        Тест 1.2: Проверка что страница читает перевод из POST /translate/stream
+        
+        Скрипт потокового перевода подключается только если повторный
+        перевод при отправке формы возьмется из кэша: кэш включен и
+        FUSE_LLM_CALLS выключен.
+        """
+        
+        monkeypatch.setattr(Config, "LLM_CACHE_ENABLED", True)
+        monkeypatch.setattr(Config, "FUSE_LLM_CALLS", False)
+        
+        response = client.get('/')
+        assert b"fetch('/translate/stream'" in response.data
+        assert b'id="stream-preview"' in response.data
+        
+        monkeypatch.setattr(Config, "FUSE_LLM_CALLS", True)
+        
+        response = client.get('/')
+        assert b"fetch('/translate/stream'" not in response.data, \
+            "В объединенном режиме потоковый перевод не подключается"
+    
+    @pytest.mark.real_render
     def test_successful_translation(self, mock_post, client, mock_api_response_success):
         """
-        Тест 1.2: Проверка успешного перевода текста
+        Тест 1.3: Проверка успешного перевода текста
         
         Что происходит:
-        1. Мокируем функцию requests.post (HTTP запрос к API)
+        1. Мокируем метод requests.Session.post (HTTP запрос к API)
         2. Отправляем POST запрос на / с текстом и языком
         3. Проверяем, что API был вызван
         4. Проверяем, что в ответе есть переведенный текст
         
         Мокирование:
-        - requests.post() теперь возвращает mock_api_response_success
+        - session.post() теперь возвращает mock_api_response_success
         - API не будет вызван по-настоящему (экономим токены!)
         
         Ожидаемый результат:
         - Статус код: 200
         - Ответ содержит оригинальный текст
         - Ответ содержит переведенный текст
+        
+        Страница рендерится настоящим шаблоном (real_render), поэтому
+        проверяется и раздел результатов index.html.
         """
         
         # Настраиваем mock для возврата успешного ответа
@@ -213,22 +243,27 @@ class TestPositiveScenarios:
             f"Ожидалось 200, получено {response.status_code}"
         
         # Проверяем, что mock был вызван (значит, функция сработала)
-        assert mock_post.called, "requests.post не был вызван"
+        assert mock_post.called, "session.post не был вызван"
         
         # Проверяем, что в ответе есть оригинальный текст
         assert b'Hello world' in response.data, \
             "Оригинальный текст не найден в ответе"
         
+        # Проверяем, что раздел результатов показал перевод и оценку
+        assert b'This is a translated text' in response.data, \
+            "Перевод не найден на странице"
+        assert b'role="alert"' not in response.data, \
+            "При успешном переводе не должно быть сообщения об ошибке"
+        
         # Проверяем, что API был вызван 2 раза (для перевода и оценки)
         assert mock_post.call_count == 2, \
             f"API должен быть вызван 2 раза (перевод + оценка), вызовов: {mock_post.call_count}"
     
-    @mock.patch('src.services.llm_client.requests.post')
     def test_translation_api_called_with_correct_parameters(
         self, mock_post, client, mock_api_response_success
     ):
         """
-        Тест 1.3: Проверка корректности параметров при вызове API
+        Тест 1.4: Проверка корректности параметров при вызове API
         
         Что проверяем:
         1. Что API вызывается с правильным model_name
@@ -252,12 +287,18 @@ class TestPositiveScenarios:
         assert first_call[1]['url'] == Config.API_ENDPOINT, \
             f"Неправильный URL: {first_call[1]['url']}"
         
-        # Проверяем, что в заголовках есть Authorization
-        headers = first_call[1]['headers']
+        # Проверяем, что в заголовках сессии есть Authorization
+        # (заголовки задаются один раз на уровне requests.Session)
+        headers = _get_client()._session.headers
         assert 'Authorization' in headers, \
             "Authorization header не найден"
         assert headers['Authorization'].startswith('Bearer '), \
             "Authorization header имеет неправильный формат"
+        
+        # Проверяем, что тело запроса - валидный JSON с моделью и промптом
+        body = orjson.loads(first_call[1]['data'])
+        assert body['model_name'] == Config.TRANSLATION_MODEL
+        assert 'Test text' in body['prompt']
 
 
 # ============================================================================
@@ -272,15 +313,14 @@ class TestErrorHandling:
     Группа тестов для проверки обработки ошибок.
     """
     
-    @mock.patch('src.services.llm_client.requests.post')
     def test_api_server_error_handled_gracefully(
-        self, mock_post, client, mock_api_response_error
+        self, mock_post, client, mock_api_response_error, fast_render
     ):
         """
         Тест 2.1: Проверка обработки ошибки сервера (500)
         
         Что происходит:
-        1. Мокируем функцию requests.post для возврата ошибки 500
+        1. Мокируем метод requests.Session.post для возврата ошибки 500
         2. Отправляем POST запрос на перевод
         3. Проверяем, что приложение не падает
         4. Проверяем, что пользователю показана ошибка
@@ -301,19 +341,17 @@ class TestErrorHandling:
         assert response.status_code == 200, \
             f"Приложение упало с ошибкой {response.status_code}"
         
-        # Проверяем, что в ответе есть сообщение об ошибке
-        # (может быть на русском или английском)
-        response_text = response.data.decode('utf-8')
-        assert 'ошибка' in response_text.lower() or 'error' in response_text.lower(), \
-            "Сообщение об ошибке не найдено в ответе"
+        # Проверяем, что в шаблон передано сообщение об ошибке
+        error_message = fast_render.call_args.kwargs.get("error_message")
+        assert error_message and "Ошибка" in error_message, \
+            f"Сообщение об ошибке не передано в шаблон: {error_message!r}"
     
-    @mock.patch('src.services.llm_client.requests.post')
-    def test_connection_error_handled(self, mock_post, client):
+    def test_connection_error_handled(self, mock_post, client, fast_render):
         """
         Тест 2.2: Проверка обработки ошибки соединения
         
         Что происходит:
-        1. Мокируем requests.post для выбрасывания исключения ConnectionError
+        1. Мокируем requests.Session.post для выбрасывания исключения ConnectionError
         2. Отправляем POST запрос
         3. Проверяем, что приложение не упало
         4. Проверяем, что показана ошибка
@@ -334,19 +372,20 @@ class TestErrorHandling:
         # Проверяем, что приложение не упало
         assert response.status_code == 200
         
-        # Проверяем, что в ответе есть указание на ошибку
-        response_text = response.data.decode('utf-8')
-        assert 'ошибка' in response_text.lower() or 'error' in response_text.lower()
+        # Проверяем, что в шаблон передано сообщение об ошибке
+        error_message = fast_render.call_args.kwargs.get("error_message")
+        assert error_message and "Ошибка" in error_message
     
-    @mock.patch('src.services.llm_client.requests.post')
+    @pytest.mark.real_render
     def test_timeout_error_handled(self, mock_post, client):
         """
         Тест 2.3: Проверка обработки ошибки таймаута
         
         Что происходит:
-        1. Мокируем requests.post для выбрасывания исключения Timeout
+        1. Мокируем requests.Session.post для выбрасывания исключения Timeout
         2. Отправляем POST запрос
         3. Проверяем, что приложение справилось с ошибкой
+        4. Проверяем, что настоящий шаблон показал блок с ошибкой (real_render)
         
         Это симулирует ситуацию, когда сервер отвечает очень долго.
         """
@@ -363,8 +402,12 @@ class TestErrorHandling:
         
         # Проверяем результат
         assert response.status_code == 200
+        
+        # Проверяем, что шаблон вывел сообщение об ошибке и не вывел результаты
+        assert b'role="alert"' in response.data
+        assert 'Ошибка'.encode() in response.data
+        assert '</span>Результаты'.encode() not in response.data
     
-    @mock.patch('src.services.llm_client.requests.post')
     def test_invalid_json_response_handled(
         self, mock_post, client, mock_api_response_invalid_json
     ):
@@ -541,6 +584,65 @@ class TestPromptBuilding:
         # Проверяем, что есть инструкция для оценки
         assert 'evaluat' in prompt.lower() or 'оцен' in prompt.lower(), \
             "Промпт должен содержать инструкцию для оценки"
+    
+    def test_combined_prompt_contains_text_and_format(self):
+        """
+        Тест 4.4: Проверка что объединенный промпт содержит текст, язык и формат
+        """
+        
+        prompt = build_combined_prompt("Hello world", "german")
+        
+        assert "Hello world" in prompt
+        assert "German" in prompt
+        assert "<TRANSLATION>" in prompt and "<EVALUATION>" in prompt, \
+            "Промпт должен описывать формат ответа с двумя блоками"
+    
+    def test_parse_combined_response_extracts_both_blocks(self):
+        """
+        Тест 4.5: Проверка разбора ответа объединенного режима
+        """
+        
+        raw = (
+            "<TRANSLATION>\nHallo Welt\n</TRANSLATION>\n"
+            "<EVALUATION>\nRating: 9\nReasoning: Accurate\n</EVALUATION>"
+        )
+        
+        translated, evaluation = parse_combined_response(raw)
+        
+        assert translated == "Hallo Welt"
+        assert evaluation == "Rating: 9\nReasoning: Accurate"
+    
+    def test_parse_combined_response_without_tags(self):
+        """
+        Тест 4.6: Если модель не соблюла формат, весь ответ считается переводом
+        """
+        
+        assert parse_combined_response("Hallo Welt") == ("Hallo Welt", None)
+        assert parse_combined_response(None) == (None, None)
+    
+    def test_parse_combined_response_drops_evaluation_from_untagged_translation(self):
+        """
+        Тест 4.7: Без тега <TRANSLATION> блок <EVALUATION> не попадает в перевод
+        """
+        
+        raw = "Hallo Welt\n<EVALUATION>Rating: 9</EVALUATION>"
+        
+        assert parse_combined_response(raw) == ("Hallo Welt", "Rating: 9")
+    
+    def test_translate_and_rate_uses_single_api_call(self, mock_post, api_response):
+        """
+        Тест 4.8: translate_and_rate получает перевод и оценку одним запросом
+        """
+        
+        mock_post.return_value = api_response(
+            200,
+            b'{"response": "<TRANSLATION>Hallo Welt</TRANSLATION>'
+            b'<EVALUATION>Rating: 9/10</EVALUATION>"}'
+        )
+        
+        assert translate_and_rate("Hello world", "german") == ("Hallo Welt", "Rating: 9/10")
+        assert mock_post.call_count == 1
+        assert "Hello world" in orjson.loads(mock_post.call_args[1]['data'])["prompt"]
 
 
 # ============================================================================
@@ -599,6 +701,57 @@ class TestEnvironmentVariables:
         # Проверяем, что это словарь
         assert isinstance(Config.SUPPORTED_LANGUAGES, dict), \
             "SUPPORTED_LANGUAGES должен быть словарем"
+    
+    def test_invalid_log_level_falls_back_to_warning(self, monkeypatch):
+        """
+        Тест 5.4: Проверка что неизвестный LOG_LEVEL не ломает запуск приложения
+        """
+        
+        from src.config import _env_log_level
+        
+        monkeypatch.setenv("LOG_LEVEL", "verbose")
+        assert _env_log_level() == "WARNING"
+        
+        monkeypatch.setenv("LOG_LEVEL", "debug")
+        assert _env_log_level() == "DEBUG"
+
+
+@contextmanager
+def _serve_http(status=200, body=b'{"response": "ok"}', headers=None, delay=0.0):
+    """
+    Запускает локальный HTTP сервер, который на каждый POST через delay
+    секунд отвечает status и body. Возвращает (url, список запросов):
+    в список попадает путь каждого полученного запроса.
+    """
+    requests_seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            requests_seen.append(self.path)
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(delay)
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    serve_thread = threading.Thread(target=server.serve_forever)
+    serve_thread.start()
+
+    try:
+        yield "http://127.0.0.1:%d/" % server.server_address[1], requests_seen
+    finally:
+        server.shutdown()
+        server.server_close()
+        serve_thread.join()
 
 
 # ============================================================================
@@ -612,7 +765,6 @@ class TestCallLLM:
     Группа тестов для функции call_llm.
     """
     
-    @mock.patch('src.services.llm_client.requests.post')
     def test_call_llm_returns_response_text(
         self, mock_post, mock_api_response_success
     ):
@@ -635,7 +787,6 @@ class TestCallLLM:
             "call_llm должна вернуть строку"
         assert result == "This is a translated text"
     
-    @mock.patch('src.services.llm_client.requests.post')
     def test_call_llm_returns_none_on_api_error(
         self, mock_post, mock_api_response_error
     ):
@@ -656,8 +807,7 @@ class TestCallLLM:
         assert result is None, \
             "call_llm должна вернуть None при ошибке API"
     
-    @mock.patch('src.services.llm_client.requests.post')
-    def test_call_llm_handles_missing_response_key(self, mock_post):
+    def test_call_llm_handles_missing_response_key(self, mock_post, api_response):
         """
         Тест 6.3: Проверка что call_llm обрабатывает отсутствие ключа 'response'
         
@@ -665,10 +815,7 @@ class TestCallLLM:
         """
         
         # Настраиваем mock для возврата JSON без нужного ключа
-        mock_response = mock.Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"wrong_key": "value"}
-        mock_post.return_value = mock_response
+        mock_post.return_value = api_response(200, b'{"wrong_key": "value"}')
         
         # Вызываем функцию
         result = call_llm("test_model", "test_prompt")
@@ -676,6 +823,654 @@ class TestCallLLM:
         # Проверяем результат
         assert result is None, \
             "call_llm должна вернуть None если ключа 'response' нет"
+    
+    def test_call_llm_returns_none_on_invalid_json(
+        self, mock_post, mock_api_response_invalid_json
+    ):
+        """
+        Тест 6.4: Проверка что call_llm возвращает None для невалидного JSON
+        """
+        
+        mock_post.return_value = mock_api_response_invalid_json
+        
+        assert call_llm("test_model", "test_prompt") is None
+    
+    def test_call_llm_logs_truncated_prompt(
+        self, mock_post, mock_api_response_success, caplog
+    ):
+        """
+        Тест 6.5: Проверка что длинный промпт обрезается в DEBUG логах
+        
+        Логирование ленивое (logging вместо print), а длинные аргументы
+        обрезает фильтр логгера, чтобы промпт целиком не попадал в логи.
+        """
+        
+        mock_post.return_value = mock_api_response_success
+        long_prompt = "x" * 500
+        
+        with caplog.at_level("DEBUG", logger="src.services.llm_client"):
+            call_llm("test_model", long_prompt)
+        
+        messages = " ".join(record.getMessage() for record in caplog.records)
+        assert "x" * 100 in messages
+        assert long_prompt not in messages
+    
+    def test_submit_llm_runs_calls_in_background(
+        self, mock_post, mock_api_response_success
+    ):
+        """
+        Тест 6.6: Проверка что submit_llm возвращает Future с ответом
+        
+        Несколько независимых запросов можно отправить сразу и затем
+        собрать результаты через future.result().
+        """
+        
+        mock_post.return_value = mock_api_response_success
+        
+        futures = [submit_llm("test_model", f"prompt {i}") for i in range(3)]
+        results = [future.result(timeout=5) for future in futures]
+        
+        assert results == ["This is a translated text"] * 3
+        assert mock_post.call_count == 3
+    
+    @pytest.fixture
+    def mocks_enabled(self):
+        """
+        Фикстура включает ENABLE_MOCKS на время теста.
+        
+        Режим выбирается один раз при создании LLMClient, поэтому клиент
+        сбрасывается до и после теста. Флаг восстанавливается собственным
+        patch до второго сброса, не трогая monkeypatch других фикстур.
+        """
+        
+        with mock.patch.object(Config, "ENABLE_MOCKS", True):
+            reset_client_for_tests()
+            yield
+        reset_client_for_tests()
+    
+    def test_call_llm_mock_mode_returns_canned_responses(
+        self, mock_post, mocks_enabled
+    ):
+        """
+        Тест 6.7: Проверка мокированных ответов (режим Cypress, ENABLE_MOCKS)
+        
+        В этом режиме API не вызывается, а ответ выбирается по модели.
+        """
+        
+        assert call_llm(Config.TRANSLATION_MODEL, "prompt") == "The sun is shining."
+        assert call_llm(Config.EVALUATION_MODEL, "prompt") == \
+            "Rating: 9/10. Fluent and accurate."
+        assert call_llm("unknown-model", "prompt") == "Mocked Response: Default answer"
+        assert not mock_post.called, "В режиме моков API не должен вызываться"
+    
+    def test_call_llm_rejects_oversized_prompt(self, mock_post, monkeypatch):
+        """
+        Тест 6.8: Проверка что слишком большой промпт отклоняется без запроса
+        
+        Лимит считается в байтах UTF-8: кириллица занимает 2 байта на символ,
+        поэтому 60 символов кириллицы не помещаются в лимит 100 байт.
+        """
+        
+        monkeypatch.setattr(Config, "MAX_PROMPT_BYTES", 100)
+        
+        assert call_llm("test_model", "a" * 101) is None
+        assert call_llm("test_model", "я" * 60) is None
+        assert not mock_post.called, \
+            "API не должен вызываться для слишком большого промпта"
+    
+    def test_concurrent_duplicate_calls_share_one_request(
+        self, mock_post, mock_api_response_success
+    ):
+        """
+        Тест 6.9: Проверка объединения одинаковых одновременных запросов
+        
+        Пока первый запрос еще выполняется, такие же запросы из других
+        потоков не идут в API, а ждут и получают тот же ответ.
+        """
+        
+        request_started = threading.Event()
+        release_response = threading.Event()
+        
+        def slow_post(*args, **kwargs):
+            request_started.set()
+            release_response.wait(timeout=5)
+            return mock_api_response_success
+        
+        mock_post.side_effect = slow_post
+        
+        results = []
+        
+        def worker():
+            results.append(call_llm("test_model", "same prompt"))
+        
+        threads = [threading.Thread(target=worker) for _ in range(3)]
+        threads[0].start()
+        assert request_started.wait(timeout=5)
+        
+        for thread in threads[1:]:
+            thread.start()
+        time.sleep(0.1)  # даем потокам подключиться к уже идущему запросу
+        release_response.set()
+        
+        for thread in threads:
+            thread.join(timeout=5)
+        
+        assert results == ["This is a translated text"] * 3
+        assert mock_post.call_count == 1, \
+            f"Одинаковые запросы должны быть объединены, вызовов: {mock_post.call_count}"
+    
+    def test_call_llm_uses_connect_and_read_timeouts(
+        self, mock_post, mock_api_response_success
+    ):
+        """
+        Тест 6.10: Проверка что таймаут передается как (подключение, чтение)
+        """
+        
+        mock_post.return_value = mock_api_response_success
+        
+        call_llm("test_model", "test_prompt")
+        
+        assert mock_post.call_args[1]['timeout'] == \
+            (Config.CONNECT_TIMEOUT, Config.READ_TIMEOUT)
+    
+    def test_circuit_breaker_stops_calls_after_connection_errors(self, mock_post):
+        """
+        Тест 6.11: Проверка что после серии ошибок подключения API не вызывается
+        
+        Выключатель (circuit breaker) размыкается после
+        BREAKER_FAILURE_THRESHOLD ошибок и сразу возвращает None.
+        """
+        
+        import requests
+        mock_post.side_effect = requests.exceptions.ConnectionError("API down")
+        breaker = _get_client()._breaker
+        breaker.reset()
+        
+        try:
+            for i in range(breaker.failure_threshold):
+                assert call_llm("test_model", f"prompt {i}") is None
+            
+            assert mock_post.call_count == breaker.failure_threshold
+            
+            assert call_llm("test_model", "one more prompt") is None
+            assert mock_post.call_count == breaker.failure_threshold, \
+                "При разомкнутом выключателе запрос к API не должен отправляться"
+        finally:
+            breaker.reset()
+    
+    def test_llm_client_created_lazily(self):
+        """
+        Тест 6.12: Проверка что LLMClient создается при первом вызове
+        
+        После сброса клиента модуль не держит экземпляр LLMClient,
+        а следующее обращение создает его заново.
+        """
+        
+        from src.services import llm_client
+        
+        reset_client_for_tests()
+        assert llm_client._client is None, \
+            "Клиент не должен существовать до первого вызова"
+        
+        assert _get_client() is _get_client(), \
+            "Повторные обращения должны возвращать один и тот же клиент"
+    
+    def test_session_pools_http_and_https(self):
+        """
+        Тест 6.13: Проверка что http:// и https:// используют общий пул соединений
+        """
+        
+        session = _get_client()._session
+        adapter = session.get_adapter("https://api.example.com")
+        
+        assert session.get_adapter("http://localhost:8000") is adapter
+        assert adapter._pool_maxsize == Config.POOL_MAXSIZE
+    
+    def test_read_timeout_is_not_retried(self, monkeypatch):
+        """
+        Тест 6.14: Проверка что таймаут чтения не повторяется адаптером
+        
+        Запрос уходит на локальный сокет, который принимает соединение,
+        но никогда не отвечает. Session.post здесь НЕ мокируется, поэтому
+        проверяется настоящий HTTPAdapter с настройками Retry: должно быть
+        ровно одно соединение, а ошибка - таймаут, а не ошибка подключения.
+        """
+        
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.bind(("127.0.0.1", 0))
+        server.listen(8)
+        server.settimeout(0.1)
+        accepted = []
+        stop = threading.Event()
+        
+        def accept_loop():
+            while not stop.is_set():
+                try:
+                    connection, _ = server.accept()
+                except socket.timeout:
+                    continue
+                accepted.append(connection)
+        
+        acceptor = threading.Thread(target=accept_loop)
+        acceptor.start()
+        
+        llm = LLMClient()
+        llm.api_endpoint = "http://127.0.0.1:%d/" % server.getsockname()[1]
+        llm.timeout = (1, 0.3)
+        
+        try:
+            with mock.patch.object(llm._breaker, "record_failure") as record_failure:
+                assert llm.call_llm("test_model", "test_prompt") is None
+        finally:
+            stop.set()
+            acceptor.join()
+            for connection in accepted:
+                connection.close()
+            server.close()
+            llm.close()
+        
+        assert len(accepted) == 1, \
+            f"Таймаут чтения не должен повторяться, соединений: {len(accepted)}"
+        record_failure.assert_not_called()
+    
+    def test_retry_after_header_does_not_stall_retries(self):
+        """
+        Тест 6.15: Проверка что большой Retry-After не задерживает повторы
+        
+        Сервер всегда отвечает 503 с Retry-After: 3600. Адаптер повторяет
+        запрос (всего 3 запроса), но паузы между повторами - только
+        backoff_factor, а не час из заголовка.
+        """
+        
+        llm = LLMClient()
+        
+        with _serve_http(status=503, body=b"Service Unavailable",
+                         headers={"Retry-After": "3600"}) as (url, requests_seen):
+            llm.api_endpoint = url
+            started = time.monotonic()
+            result = llm.call_llm("test_model", "test_prompt")
+            elapsed = time.monotonic() - started
+        
+        llm.close()
+        
+        assert result is None
+        assert len(requests_seen) == 3, \
+            f"503 должен повторяться дважды, запросов: {len(requests_seen)}"
+        assert elapsed < 5, f"Повторы не должны ждать Retry-After ({elapsed:.1f} сек)"
+
+
+# ============================================================================
+# ТЕСТЫ ФУНКЦИИ acall_llm (асинхронная версия)
+# ============================================================================
+
+def _make_async_session(status, body=b"", text=""):
+    """
+    Создает mock aiohttp-сессии, у которой session.post(...) работает
+    как асинхронный контекстный менеджер и возвращает заданный ответ.
+    """
+    mock_response = mock.MagicMock()
+    mock_response.status = status
+    mock_response.read = mock.AsyncMock(return_value=body)
+    mock_response.text = mock.AsyncMock(return_value=text)
+
+    mock_session = mock.MagicMock()
+    mock_session.post.return_value.__aenter__.return_value = mock_response
+    return mock_session
+
+
+# Исключения aiohttp и метод выключателя, который должен быть вызван
+_ASYNC_BREAKER_OUTCOMES = [
+    (aiohttp.ServerTimeoutError("Connection timeout to host"), "record_failure"),
+    (aiohttp.ServerDisconnectedError(), "record_failure"),
+    (asyncio.TimeoutError(), "record_success"),
+]
+if hasattr(aiohttp, "SocketTimeoutError"):
+    _ASYNC_BREAKER_OUTCOMES.append(
+        (aiohttp.SocketTimeoutError("Timeout on reading data from socket"), "record_success")
+    )
+
+
+class TestAsyncCallLLM:
+    """
+    Группа тестов для асинхронной функции acall_llm.
+    """
+
+    def test_acall_llm_returns_response_text(self):
+        """
+        Тест 6.16: Проверка что acall_llm возвращает текст ответа
+        """
+
+        mock_session = _make_async_session(200, b'{"response": "Async translated text"}')
+
+        with mock.patch.object(
+            _get_client(), '_get_async_session', return_value=mock_session
+        ):
+            result = asyncio.run(acall_llm("test_model", "test_prompt"))
+
+        assert result == "Async translated text"
+
+        # Проверяем, что запрос ушел на правильный endpoint с правильным телом
+        call_args = mock_session.post.call_args
+        assert call_args[0][0] == Config.API_ENDPOINT
+        assert orjson.loads(call_args[1]['data']) == {
+            "model_name": "test_model",
+            "prompt": "test_prompt"
+        }
+
+    def test_acall_llm_returns_none_on_api_error(self):
+        """
+        Тест 6.17: Проверка что acall_llm возвращает None при ошибке API
+        """
+
+        mock_session = _make_async_session(500, text="Internal Server Error")
+
+        with mock.patch.object(
+            _get_client(), '_get_async_session', return_value=mock_session
+        ):
+            result = asyncio.run(acall_llm("test_model", "test_prompt"))
+
+        assert result is None, \
+            "acall_llm должна вернуть None при ошибке API"
+    
+    @pytest.mark.parametrize("error, breaker_method", _ASYNC_BREAKER_OUTCOMES)
+    def test_acall_llm_records_breaker_outcome(self, error, breaker_method):
+        """
+        Тест 6.18: Проверка что каждая ошибка сети учитывается выключателем
+        
+        Таймаут и обрыв подключения - ошибка, таймаут чтения - успешное
+        подключение (как в синхронном call_llm). Иначе пробный запрос
+        полуоткрытого выключателя блокировал бы API на весь cooldown.
+        """
+        
+        llm = LLMClient()
+        mock_session = mock.MagicMock()
+        mock_session.post.side_effect = error
+        
+        with mock.patch.object(llm, '_get_async_session', return_value=mock_session), \
+                mock.patch.object(llm._breaker, breaker_method) as record:
+            assert asyncio.run(llm.acall_llm("test_model", "test_prompt")) is None
+        
+        llm.close()
+        record.assert_called_once_with()
+    
+    def test_acall_llm_connect_timeouts_open_breaker(self):
+        """
+        Тест 6.19: Проверка что таймауты подключения размыкают выключатель
+        """
+        
+        llm = LLMClient()
+        mock_session = mock.MagicMock()
+        mock_session.post.side_effect = aiohttp.ServerTimeoutError("Connection timeout to host")
+        
+        async def call_many():
+            return [
+                await llm.acall_llm("test_model", f"prompt {i}")
+                for i in range(10)
+            ]
+        
+        with mock.patch.object(llm, '_get_async_session', return_value=mock_session):
+            results = asyncio.run(call_many())
+        
+        llm.close()
+        
+        assert results == [None] * 10
+        assert mock_session.post.call_count == llm._breaker.failure_threshold, \
+            "После размыкания выключателя запросы к API не должны отправляться"
+    
+    def test_follower_survives_cancelled_leader(self):
+        """
+        Тест 6.20: Проверка что отмена задачи-лидера не отменяет ожидающих
+        
+        Задачи A и B отправляют одинаковый запрос, B ждет ответ A. Если
+        отменить только A, задача B не должна получить CancelledError -
+        она повторяет запрос сама и возвращает ответ.
+        """
+        
+        llm = LLMClient()
+        calls = []
+        
+        async def fake_apost(model_name, prompt, cache_key):
+            calls.append(prompt)
+            if len(calls) == 1:
+                await asyncio.sleep(10)  # запрос лидера, который будет отменен
+            return "Retried answer"
+        
+        async def scenario():
+            leader = asyncio.create_task(llm.acall_llm("test_model", "same prompt"))
+            await asyncio.sleep(0)
+            follower = asyncio.create_task(llm.acall_llm("test_model", "same prompt"))
+            await asyncio.sleep(0)
+            
+            leader.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await leader
+            
+            return await follower
+        
+        with mock.patch.object(llm, "_apost", side_effect=fake_apost):
+            result = asyncio.run(scenario())
+        
+        llm.close()
+        
+        assert result == "Retried answer"
+        assert len(calls) == 2
+    
+    def test_async_session_has_default_headers(self):
+        """
+        Тест 6.21: Проверка что заголовки задаются aiohttp-сессии при создании
+        
+        Authorization и Content-Type не передаются в каждом запросе,
+        а хранятся в самой сессии.
+        """
+        
+        async def get_session_headers():
+            llm = _get_client()
+            session = await llm._get_async_session()
+            headers = dict(session.headers)
+            await llm.aclose()
+            return headers
+        
+        headers = asyncio.run(get_session_headers())
+        
+        assert headers['Content-Type'] == 'application/json'
+        assert headers['Authorization'].startswith('Bearer ')
+    
+    def test_async_session_is_closed_when_its_loop_stops(self):
+        """
+        Тест 6.22: Проверка что сессия закрывается при завершении asyncio.run
+        
+        Каждый asyncio.run создает новый event loop и новую aiohttp-сессию;
+        предыдущая сессия не должна оставаться открытой.
+        """
+        
+        llm = LLMClient()
+        
+        async def get_session():
+            return await llm._get_async_session()
+        
+        first = asyncio.run(get_session())
+        assert first.closed, "Сессия должна закрыться вместе со своим event loop"
+        
+        second = asyncio.run(get_session())
+        assert second is not first
+        assert second.closed
+        llm.close()
+    
+    def test_event_loops_in_two_threads_keep_their_own_sessions(self):
+        """
+        Тест 6.23: Проверка что loop в другом потоке не закрывает чужую сессию
+        
+        Два потока одновременно выполняют asyncio.run(acall_llm(...)) к
+        медленному серверу. Каждый loop использует свою aiohttp-сессию,
+        поэтому оба запроса должны получить ответ.
+        """
+        
+        llm = LLMClient()
+        results = {}
+        
+        def worker(name):
+            results[name] = asyncio.run(llm.acall_llm("test_model", "prompt " + name))
+        
+        with _serve_http(delay=0.6) as (url, requests_seen):
+            llm.api_endpoint = url
+            
+            first = threading.Thread(target=worker, args=("A",))
+            first.start()
+            time.sleep(0.2)  # первый запрос уже ждет ответ сервера
+            second = threading.Thread(target=worker, args=("B",))
+            second.start()
+            
+            first.join(timeout=5)
+            second.join(timeout=5)
+        
+        llm.close()
+        
+        assert results == {"A": "ok", "B": "ok"}
+        assert len(requests_seen) == 2
+    
+    def test_acall_llm_reads_cache_outside_event_loop(self, monkeypatch):
+        """
+        Тест 6.24: Проверка что чтение кэша (SQLite) не блокирует event loop
+        """
+        
+        monkeypatch.setattr(Config, "LLM_CACHE_ENABLED", True)
+        llm = _get_client()
+        lookup_threads = []
+        
+        def fake_lookup(model_name, prompt):
+            lookup_threads.append(threading.current_thread())
+            return "cache_key", "Cached async answer"
+        
+        async def call():
+            return await llm.acall_llm("test_model", "test_prompt"), threading.current_thread()
+        
+        with mock.patch.object(llm, "_cache_lookup", side_effect=fake_lookup):
+            result, loop_thread = asyncio.run(call())
+        
+        assert result == "Cached async answer"
+        assert lookup_threads and lookup_threads[0] is not loop_thread
+
+
+# ============================================================================
+# ТЕСТЫ ФУНКЦИИ call_llm_stream (потоковая версия)
+# ============================================================================
+
+def _make_stream_response(content_type, lines=(), content=b""):
+    """
+    Создает mock потокового ответа requests: post(..., stream=True)
+    используется как контекстный менеджер и возвращает сам ответ.
+    """
+    mock_response = mock.MagicMock()
+    mock_response.__enter__.return_value = mock_response
+    mock_response.status_code = 200
+    mock_response.headers = {"Content-Type": content_type}
+    mock_response.iter_lines.return_value = iter(lines)
+    mock_response.content = content
+    return mock_response
+
+
+class TestStreamCallLLM:
+    """
+    Группа тестов для потоковой функции call_llm_stream и маршрута
+    POST /translate/stream.
+    """
+
+    def test_stream_yields_sse_deltas(self, mock_post):
+        """
+        Тест 6.25: Проверка что фрагменты server-sent events выдаются по мере чтения
+        """
+
+        mock_post.return_value = _make_stream_response(
+            "text/event-stream",
+            lines=[
+                b'data: {"delta": "Hello"}',
+                b'',
+                b'data: {"delta": ", world"}',
+                b'data: [DONE]',
+            ]
+        )
+
+        chunks = list(call_llm_stream("test_model", "test_prompt"))
+
+        assert chunks == ["Hello", ", world"]
+        assert mock_post.call_args[1]['stream'] is True
+
+    def test_stream_falls_back_to_plain_json(self, mock_post):
+        """
+        Тест 6.26: Проверка что обычный JSON ответ выдается одним фрагментом
+        """
+
+        mock_post.return_value = _make_stream_response(
+            "application/json",
+            content=b'{"response": "Whole translation"}'
+        )
+
+        assert list(call_llm_stream("test_model", "test_prompt")) == ["Whole translation"]
+
+    def test_stream_route_emits_events(self, mock_post, client):
+        """
+        Тест 6.27: Проверка что POST /translate/stream отдает text/event-stream
+        """
+
+        mock_post.return_value = _make_stream_response(
+            "text/event-stream",
+            lines=[b'data: {"delta": "Bonjour"}', b'data: [DONE]']
+        )
+
+        response = client.post('/translate/stream', data={
+            'text': 'Hello',
+            'language': 'french'
+        })
+
+        assert response.status_code == 200
+        assert response.mimetype == "text/event-stream"
+        assert response.data == b'data: {"delta":"Bonjour"}\n\ndata: {"done":true}\n\n'
+
+    def test_stream_route_reports_api_error(self, mock_post, client):
+        """
+        Тест 6.28: Проверка что ошибка API передается клиенту событием error
+        """
+        
+        mock_response = _make_stream_response("text/plain")
+        mock_response.status_code = 500
+        mock_response.text = "Internal Server Error"
+        mock_post.return_value = mock_response
+        
+        response = client.post('/translate/stream', data={
+            'text': 'Hello',
+            'language': 'french'
+        })
+        
+        assert response.status_code == 200
+        assert b'"error"' in response.data
+        assert b'"done"' not in response.data, \
+            "При ошибке поток не должен заканчиваться событием done"
+
+    def test_stream_raises_on_api_error(self, mock_post):
+        """
+        Тест 6.29: Проверка что call_llm_stream выбрасывает LLMStreamError при ошибке API
+        """
+        
+        mock_response = _make_stream_response("text/plain")
+        mock_response.status_code = 500
+        mock_response.text = "Internal Server Error"
+        mock_post.return_value = mock_response
+        
+        with pytest.raises(LLMStreamError):
+            list(call_llm_stream("test_model", "test_prompt"))
+
+    def test_stream_route_rejects_invalid_input(self, client):
+        """
+        Тест 6.30: Проверка что невалидный ввод возвращает 400 без вызова API
+        """
+
+        response = client.post('/translate/stream', data={
+            'text': '',
+            'language': 'french'
+        })
+
+        assert response.status_code == 400
+        assert "error" in response.get_json()
 
 
 # ============================================================================
@@ -684,18 +1479,38 @@ class TestCallLLM:
 # Эти тесты проверяют работу нескольких компонентов вместе
 # Начинающим QA-специалистам: интеграционные тесты очень важны!
 
+@pytest.fixture(scope="class")
+def en_form():
+    """
+    Данные HTML формы, общие для интеграционных тестов класса.
+    
+    Тесты не изменяют словарь (при необходимости строят новый через
+    {**en_form, ...}), поэтому он создается один раз на класс.
+    """
+    
+    return {'text': 'Original English text', 'language': 'english'}
+
+
 class TestIntegration:
     """
     Группа интеграционных тестов.
     """
     
-    @mock.patch('src.services.llm_client.requests.post')
+    @pytest.mark.parametrize("language, language_name", [
+        ("english", "English"),
+        ("french", "French"),
+        ("german", "German"),
+    ])
     def test_full_workflow_with_both_api_calls(
-        self, mock_post, client, mock_api_response_success
+        self, mock_post, client, en_form, translation_response, rating_response,
+        fast_render, language, language_name
     ):
         """
         Тест 7.1: Проверка полного workflow: перевод + оценка
         
+        Тест повторяется для каждого поддерживаемого языка; клиент и
+        mock-ответы (фикстуры) общие для всех вариантов.
+        
         Что происходит:
         1. Пользователь отправляет текст на перевод
         2. Приложение вызывает API для перевода
@@ -705,45 +1520,28 @@ class TestIntegration:
         Это самый важный тест, который проверяет весь процесс!
         """
         
-        # Настраиваем mock для возврата разных ответов
-        # Первый вызов (перевод) вернет один ответ
-        # Второй вызов (оценка) вернет другой ответ
-        mock_response_1 = mock.Mock()
-        mock_response_1.status_code = 200
-        mock_response_1.json.return_value = {
-            "response": "Translated text"
-        }
-        
-        mock_response_2 = mock.Mock()
-        mock_response_2.status_code = 200
-        mock_response_2.json.return_value = {
-            "response": "Rating: 9/10"
-        }
-        
         # Настраиваем mock для возврата разных ответов при разных вызовах
-        mock_post.side_effect = [mock_response_1, mock_response_2]
+        # Первый вызов (перевод) вернет translation_response,
+        # второй вызов (оценка) - rating_response (фикстуры из conftest.py)
+        mock_post.side_effect = [translation_response, rating_response]
         
         # Отправляем запрос
-        form_data = {
-            'text': 'Original English text',
-            'language': 'english'
-        }
-        response = client.post('/', data=form_data)
+        response = client.post('/', data={**en_form, 'language': language})
         
         # Проверяем результаты
         assert response.status_code == 200
-        response_text = response.data.decode('utf-8')
+        data = response.data
         
         # Проверяем, что оба API вызова произошли
         assert mock_post.call_count == 2, \
             f"Должно быть 2 вызова API (перевод + оценка), было {mock_post.call_count}"
         
         # Проверяем, что результаты доступны в ответе
-        assert 'Original English text' in response_text or 'English' in response_text
+        assert b'Translated text' in data
+        assert fast_render.call_args.kwargs["target_language"] == language_name
     
-    @mock.patch('src.services.llm_client.requests.post')
     def test_workflow_with_first_api_call_failure(
-        self, mock_post, client, mock_api_response_error
+        self, mock_post, client, en_form, mock_api_response_error
     ):
         """
         Тест 7.2: Проверка workflow когда первый API вызов (перевод) падает
@@ -760,19 +1558,72 @@ class TestIntegration:
         mock_post.return_value = mock_api_response_error
         
         # Отправляем запрос
-        form_data = {
-            'text': 'Test text',
-            'language': 'english'
-        }
-        response = client.post('/', data=form_data)
+        response = client.post('/', data=en_form)
         
         # Проверяем, что приложение справилось
         assert response.status_code == 200
         
         # Проверяем, что API был вызван только 1 раз (перевод)
         # Оценка не должна быть вызвана если перевод упал
-        assert mock_post.call_count <= 2, \
-            "API должен быть вызван максимум 2 раза"
+        assert mock_post.call_count == 1, \
+            f"После ошибки перевода оценка не должна вызываться, вызовов API: {mock_post.call_count}"
+
+
+    def test_fused_workflow_makes_single_api_call(
+        self, mock_post, client, en_form, monkeypatch, api_response
+    ):
+        """
+        Тест 7.3: Проверка объединенного режима (FUSE_LLM_CALLS=1)
+        
+        Перевод и оценка должны быть получены одним запросом к API.
+        """
+        
+        monkeypatch.setattr(Config, "FUSE_LLM_CALLS", True)
+        
+        mock_post.return_value = api_response(
+            200,
+            b'{"response": "<TRANSLATION>Fused translation</TRANSLATION>'
+            b'<EVALUATION>Rating: 8/10</EVALUATION>"}'
+        )
+        
+        response = client.post('/', data=en_form)
+        
+        assert response.status_code == 200
+        assert mock_post.call_count == 1, \
+            f"В объединенном режиме должен быть 1 вызов API, было {mock_post.call_count}"
+        assert b'Fused translation' in response.data
+        assert b'Rating: 8/10' in response.data
+    
+    def test_warm_cache_workflow_makes_no_api_calls(
+        self, mock_post, client, en_form, translation_response, rating_response,
+        monkeypatch, tmp_path
+    ):
+        """
+        Тест 7.4: Проверка что повторный одинаковый запрос обслуживается кэшем
+        
+        Первый запрос делает 2 вызова API (перевод + оценка), повторный
+        запрос с тем же текстом берет оба ответа из кэша.
+        """
+        
+        from src.services import response_cache
+        
+        monkeypatch.setattr(Config, "LLM_CACHE_ENABLED", True)
+        monkeypatch.setattr(Config, "LLM_CACHE_PATH", str(tmp_path / "llm_cache.sqlite3"))
+        mock_post.side_effect = [translation_response, rating_response]
+        
+        try:
+            client.post('/', data=en_form)
+            assert mock_post.call_count == 2
+            
+            mock_post.reset_mock()
+            response = client.post('/', data=en_form)
+        finally:
+            response_cache.close()
+        
+        assert response.status_code == 200
+        assert mock_post.call_count == 0, \
+            f"На прогретом кэше API не должен вызываться, было {mock_post.call_count}"
+        assert b'Translated text' in response.data
 
 
 # ============================================================================
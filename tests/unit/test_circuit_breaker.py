@@ -0,0 +1,114 @@
+# ============================================================================
+# test_circuit_breaker.py - Юнит-тесты для circuit breaker
+# ============================================================================
+# Этот файл проверяет модуль src/services/circuit_breaker.py:
+# 1. Выключатель размыкается после нескольких ошибок подключения
+# 2. После cooldown пропускается пробный запрос
+# 3. Успешный запрос сбрасывает счетчик ошибок
+#
+# Время подменяется через mock, поэтому тесты не ждут реальные секунды.
+# ============================================================================
+
+from unittest import mock
+from src.services.circuit_breaker import CircuitBreaker
+
+
+MONOTONIC = "src.services.circuit_breaker.time.monotonic"
+
+
+class TestCircuitBreaker:
+    """
+    Группа тестов для CircuitBreaker.
+    """
+    
+    def test_opens_after_threshold_failures(self):
+        """
+        Тест 10.1: После failure_threshold ошибок запросы отклоняются
+        """
+        
+        breaker = CircuitBreaker(failure_threshold=3, window=30, cooldown=30)
+        
+        with mock.patch(MONOTONIC, return_value=100.0):
+            breaker.record_failure()
+            breaker.record_failure()
+            assert breaker.allow() is True
+            
+            breaker.record_failure()
+            assert breaker.allow() is False
+    
+    def test_failures_outside_window_are_forgotten(self):
+        """
+        Тест 10.2: Ошибки старше window не учитываются
+        """
+        
+        breaker = CircuitBreaker(failure_threshold=2, window=10, cooldown=30)
+        
+        with mock.patch(MONOTONIC, return_value=100.0):
+            breaker.record_failure()
+        with mock.patch(MONOTONIC, return_value=120.0):
+            breaker.record_failure()
+            assert breaker.allow() is True
+    
+    def test_half_open_after_cooldown(self):
+        """
+        Тест 10.3: После cooldown проходит пробный запрос; ошибка снова размыкает
+        """
+        
+        breaker = CircuitBreaker(failure_threshold=1, window=30, cooldown=30)
+        
+        with mock.patch(MONOTONIC, return_value=100.0):
+            breaker.record_failure()
+            assert breaker.allow() is False
+        
+        with mock.patch(MONOTONIC, return_value=131.0):
+            assert breaker.allow() is True, "После cooldown должен пройти пробный запрос"
+            breaker.record_failure()
+            assert breaker.allow() is False, "Ошибка пробного запроса снова размыкает выключатель"
+    
+    def test_success_resets_failures(self):
+        """
+        Тест 10.4: Успешное подключение сбрасывает счетчик ошибок
+        """
+        
+        breaker = CircuitBreaker(failure_threshold=2, window=30, cooldown=30)
+        
+        with mock.patch(MONOTONIC, return_value=100.0):
+            breaker.record_failure()
+            breaker.record_success()
+            breaker.record_failure()
+            assert breaker.allow() is True
+    
+    def test_half_open_allows_single_trial(self):
+        """
+        Тест 10.5: В полуоткрытом состоянии проходит только один пробный запрос
+        """
+        
+        breaker = CircuitBreaker(failure_threshold=1, window=30, cooldown=30)
+        
+        with mock.patch(MONOTONIC, return_value=100.0):
+            breaker.record_failure()
+        
+        with mock.patch(MONOTONIC, return_value=131.0):
+            assert breaker.allow() is True, "Первый запрос после cooldown - пробный"
+            assert breaker.allow() is False, "Пока идет пробный запрос, остальные отклоняются"
+            
+            breaker.record_success()
+            assert breaker.allow() is True, "Успешный пробный запрос замыкает выключатель"
+            assert breaker.allow() is True
+    
+    def test_stuck_trial_is_replaced_after_cooldown(self):
+        """
+        Тест 10.6: Если пробный запрос не сообщил результат, через cooldown
+        пропускается новый пробный запрос
+        """
+        
+        breaker = CircuitBreaker(failure_threshold=1, window=30, cooldown=30)
+        
+        with mock.patch(MONOTONIC, return_value=100.0):
+            breaker.record_failure()
+        with mock.patch(MONOTONIC, return_value=131.0):
+            assert breaker.allow() is True
+        with mock.patch(MONOTONIC, return_value=150.0):
+            assert breaker.allow() is False
+        with mock.patch(MONOTONIC, return_value=162.0):
+            assert breaker.allow() is True
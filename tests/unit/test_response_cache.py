@@ -0,0 +1,207 @@
+# ============================================================================
+# test_response_cache.py - Юнит-тесты для кэша ответов LLM
+# ============================================================================
+# Этот файл проверяет модуль src/services/response_cache.py:
+# 1. Построение ключа кэша
+# 2. Сохранение и чтение ответов
+# 3. Устаревание (TTL) и вытеснение (LRU)
+# 4. Работу кэша внутри call_llm
+#
+# Каждый тест работает с отдельным SQLite файлом во временной директории.
+# ============================================================================
+
+import pytest
+from unittest import mock
+from src.config import Config
+from src.services import response_cache
+from src.services.llm_client import call_llm
+
+
+# ============================================================================
+# ФИКСТУРЫ (FIXTURES)
+# ============================================================================
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    """
+    Фикстура направляет кэш во временный SQLite файл и включает его.
+    После теста соединение закрывается.
+    """
+    
+    monkeypatch.setattr(Config, "LLM_CACHE_ENABLED", True)
+    monkeypatch.setattr(Config, "LLM_CACHE_PATH", str(tmp_path / "llm_cache.sqlite3"))
+    
+    yield
+    
+    response_cache.close()
+
+
+# ============================================================================
+# ТЕСТЫ КЛЮЧА КЭША
+# ============================================================================
+
+class TestCacheKey:
+    """
+    Группа тестов для функции make_key.
+    """
+    
+    def test_key_ignores_surrounding_whitespace_and_model_case(self):
+        """
+        Тест 8.1: Пробелы по краям промпта и регистр модели не меняют ключ
+        """
+        
+        key_1 = response_cache.make_key("Qwen/Model", "Hello world")
+        key_2 = response_cache.make_key("  qwen/model ", "  Hello world\n")
+        
+        assert key_1 == key_2
+    
+    def test_key_collapses_inner_whitespace_but_keeps_case(self):
+        """
+        Тест 8.2: Лишние пробелы внутри строки не меняют ключ, регистр - меняет
+        """
+        
+        base = response_cache.make_key("model", "Original English\ntext")
+        
+        assert base == response_cache.make_key("model", "Original   English \n\ttext")
+        assert base != response_cache.make_key("model", "Original English text")
+        assert base != response_cache.make_key("model", "original english\ntext")
+    
+    def test_key_depends_on_model_and_prompt(self):
+        """
+        Тест 8.3: Разные модели и разные промпты дают разные ключи
+        """
+        
+        base = response_cache.make_key("model_a", "prompt")
+        
+        assert base != response_cache.make_key("model_b", "prompt")
+        assert base != response_cache.make_key("model_a", "other prompt")
+
+
+# ============================================================================
+# ТЕСТЫ ХРАНИЛИЩА
+# ============================================================================
+
+class TestCacheStorage:
+    """
+    Группа тестов для чтения, записи, TTL и вытеснения.
+    """
+    
+    def test_set_then_get_returns_value(self):
+        """
+        Тест 8.4: Сохраненный ответ возвращается по тому же ключу
+        """
+        
+        key = response_cache.make_key("model", "prompt")
+        response_cache.set(key, "cached answer", "model")
+        
+        assert response_cache.get(key) == "cached answer"
+    
+    def test_get_missing_key_returns_none(self):
+        """
+        Тест 8.5: Для неизвестного ключа возвращается None
+        """
+        
+        assert response_cache.get("missing") is None
+    
+    def test_expired_entry_is_not_returned(self, monkeypatch):
+        """
+        Тест 8.6: Запись старше LLM_CACHE_TTL считается устаревшей
+        """
+        
+        key = response_cache.make_key("model", "prompt")
+        
+        with mock.patch("src.services.response_cache.time.time", return_value=1000):
+            response_cache.set(key, "old answer", "model")
+        
+        monkeypatch.setattr(Config, "LLM_CACHE_TTL", 60)
+        with mock.patch("src.services.response_cache.time.time", return_value=1061):
+            assert response_cache.get(key) is None
+    
+    def test_least_recently_used_entries_are_evicted(self, monkeypatch):
+        """
+        Тест 8.7: При переполнении удаляются давно не использованные записи
+        """
+        
+        monkeypatch.setattr(Config, "LLM_CACHE_MAX_ENTRIES", 2)
+        
+        for timestamp, name in [(100, "first"), (200, "second"), (300, "third")]:
+            with mock.patch("src.services.response_cache.time.time", return_value=timestamp):
+                response_cache.set(name, name, "model")
+        
+        with mock.patch("src.services.response_cache.time.time", return_value=400):
+            assert response_cache.get("first") is None
+            assert response_cache.get("second") == "second"
+            assert response_cache.get("third") == "third"
+
+    def test_hot_entry_is_served_from_memory(self):
+        """
+        Тест 8.8: Недавно сохраненный ответ читается из памяти без SQLite
+        """
+        
+        key = response_cache.make_key("model", "prompt")
+        response_cache.set(key, "hot answer", "model")
+        
+        with mock.patch.object(
+            response_cache, "_get_connection", side_effect=AssertionError("SQLite не должен читаться")
+        ):
+            assert response_cache.get(key) == "hot answer"
+    
+    def test_old_entry_promoted_from_sqlite_stays_in_memory(self):
+        """
+        Тест 8.9: Старая запись из SQLite после первого чтения живет в памяти
+        
+        Запись старше LLM_MEMORY_CACHE_TTL (но моложе LLM_CACHE_TTL) после
+        чтения из SQLite должна обслуживаться из памяти, а не перечитываться.
+        """
+        
+        key = response_cache.make_key("model", "prompt")
+        
+        with mock.patch("src.services.response_cache.time.time", return_value=1000):
+            response_cache.set(key, "old answer", "model")
+        
+        # Имитируем новый процесс: память пуста, запись есть только в SQLite
+        response_cache._memory.clear()
+        
+        later = 1000 + Config.LLM_MEMORY_CACHE_TTL + 60
+        with mock.patch("src.services.response_cache.time.time", return_value=later):
+            assert response_cache.get(key) == "old answer"
+            
+            with mock.patch.object(
+                response_cache, "_get_connection", side_effect=AssertionError("SQLite не должен читаться")
+            ):
+                assert response_cache.get(key) == "old answer"
+
+
+# ============================================================================
+# ТЕСТЫ КЭША ВНУТРИ call_llm
+# ============================================================================
+
+class TestCallLLMCaching:
+    """
+    Группа тестов для проверки, что call_llm использует кэш.
+    """
+    
+    def test_repeated_prompt_is_served_from_cache(self, mock_post, api_response):
+        """
+        Тест 8.10: Повторный одинаковый запрос не обращается к API
+        """
+        
+        mock_post.return_value = api_response(200, b'{"response": "Cached translation"}')
+        
+        first = call_llm("test_model", "cache me")
+        second = call_llm("test_model", "cache me")
+        
+        assert first == second == "Cached translation"
+        assert mock_post.call_count == 1, \
+            "Второй вызов должен быть обслужен из кэша"
+    
+    def test_failed_response_is_not_cached(self, mock_post, api_response):
+        """
+        Тест 8.11: Ошибки API не кэшируются
+        """
+        
+        mock_post.return_value = api_response(500, text="Internal Server Error")
+        
+        assert call_llm("test_model", "fails") is None
+        assert call_llm("test_model", "fails") is None
+        assert mock_post.call_count == 2
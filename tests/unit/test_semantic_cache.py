@@ -0,0 +1,105 @@
+# ============================================================================
+# test_semantic_cache.py - Юнит-тесты для семантического кэша LLM
+# ============================================================================
+# Этот файл проверяет модуль src/services/semantic_cache.py:
+# 1. Похожие промпты находят сохраненный ответ
+# 2. Разные промпты с общим шаблоном НЕ считаются похожими
+# 3. Записи разных моделей не смешиваются
+# 4. Вытеснение старых записей при переполнении
+# 5. Одна запись в кэше и запрос из части слов сохраненного текста
+# ============================================================================
+
+import pytest
+from src.services.semantic_cache import SemanticCache
+
+
+TEMPLATE = "Translate the following text to English.\n\nText to translate:\n{}"
+
+
+@pytest.fixture
+def cache():
+    """
+    Фикстура создает семантический кэш с двумя уже обработанными промптами.
+    """
+    
+    semantic_cache = SemanticCache(threshold=0.92, max_size=100)
+    semantic_cache.add("model", TEMPLATE.format("Hello world"), "Hello world translated")
+    semantic_cache.add("model", TEMPLATE.format("Good morning"), "Good morning translated")
+    return semantic_cache
+
+
+class TestSemanticCache:
+    """
+    Группа тестов для SemanticCache.
+    """
+    
+    def test_near_duplicate_prompt_hits(self, cache):
+        """
+        Тест 9.1: Промпт, отличающийся регистром и пунктуацией, находит ответ
+        """
+        
+        result = cache.get("model", TEMPLATE.format("hello world!"))
+        
+        assert result == "Hello world translated"
+    
+    def test_different_text_with_same_template_misses(self, cache):
+        """
+        Тест 9.2: Общий шаблон промпта не делает разные тексты похожими
+        """
+        
+        assert cache.get("model", TEMPLATE.format("Goodbye moon")) is None
+    
+    def test_models_are_isolated(self, cache):
+        """
+        Тест 9.3: Ответ одной модели не возвращается для другой
+        """
+        
+        assert cache.get("other_model", TEMPLATE.format("Hello world")) is None
+    
+    def test_oldest_entries_are_evicted(self):
+        """
+        Тест 9.4: При превышении max_size удаляются самые старые записи
+        """
+        
+        semantic_cache = SemanticCache(threshold=0.92, max_size=2)
+        semantic_cache.add("model", TEMPLATE.format("first text"), "first")
+        semantic_cache.add("model", TEMPLATE.format("second text"), "second")
+        semantic_cache.add("model", TEMPLATE.format("third text"), "third")
+        
+        assert semantic_cache.get("model", TEMPLATE.format("first text")) is None
+        assert semantic_cache.get("model", TEMPLATE.format("third text")) == "third"
+    
+    def test_single_entry_matches_identical_and_near_duplicate_prompt(self):
+        """
+        Тест 9.5: При одной записи в кэше одинаковый и почти одинаковый промпт находят ответ
+        """
+        
+        semantic_cache = SemanticCache(threshold=0.92, max_size=100)
+        semantic_cache.add("model", TEMPLATE.format("Hello world"), "Hello world translated")
+        
+        assert semantic_cache.get("model", TEMPLATE.format("Hello world")) == "Hello world translated"
+        assert semantic_cache.get("model", TEMPLATE.format("hello, world!")) == "Hello world translated"
+        assert semantic_cache.get("model", TEMPLATE.format("Goodbye moon")) is None
+    
+    def test_query_with_subset_of_words_misses(self):
+        """
+        Тест 9.6: Запрос из части слов сохраненного текста не считается похожим
+        
+        Слово "Hello" есть во всех записях, но это слово текста пользователя,
+        а не шаблона - оно не должно отбрасываться.
+        """
+        
+        semantic_cache = SemanticCache(threshold=0.92, max_size=100)
+        semantic_cache.add("model", TEMPLATE.format("Hello world"), "Hello world translated")
+        semantic_cache.add("model", TEMPLATE.format("Hello there"), "Hello there translated")
+        
+        assert semantic_cache.get("model", TEMPLATE.format("world")) is None
+    
+    def test_same_text_for_other_language_misses(self, cache):
+        """
+        Тест 9.7: Тот же текст с другим языком перевода не находит ответ
+        """
+        
+        french_template = TEMPLATE.replace("English", "French")
+        
+        assert cache.get("model", french_template.format("Hello world")) is None